@@ -1,5 +1,23 @@
+import os
+
+
 class Config:
-    pass
+    # Play bot turns on background workers, rather than within the request
+    BOT_MOVES_ASYNC = False
+    BOT_WORKERS = 4
+    # Games that may be queued for bot turns, before they are played in the request again
+    BOT_MAX_PENDING = 64
+    # If set, bot moves are calculated in a pool of this many processes
+    BOT_MOVE_PROCESSES = 0
+    # In-progress games kept in memory between requests (0 disables the cache)
+    GAME_CACHE_MAX_ENTRIES = 1000
+    # Every game keeps a packed log of its moves; this also stores each move as a GameMove row
+    GAME_MOVE_ROWS = True
+    # Write player changes back to the seed CSV, at most once per debounce window
+    PLAYER_CSV_WRITE_BACK = False
+    PLAYER_CSV_DEBOUNCE_SECONDS = 2.0
+    # Extra PRAGMAs for SQLite connections (foreign_keys=ON is always set)
+    SQLITE_PRAGMAS = {}
 
 
 class DevConfig(Config):
@@ -11,3 +29,29 @@ class DevConfig(Config):
 
     # We need to create a secret key, if we want to use session data.
     SECRET_KEY = "\xb8}E'8\xa2Q\xc7\xe7\x1c\x96\xae\x05V\xb9q\x89D\x90\x85\xb5\x83{\x90"
+
+
+class ProdConfig(Config):
+    ENV = "Production"
+    DEBUG = False
+    SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///database.db")
+    # Optional replica (or read-only user) for game/player listings and game detail reads
+    SQLALCHEMY_READONLY_DATABASE_URI = os.environ.get("DATABASE_READONLY_URL")
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool (server databases only)
+    DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_PRE_PING = True
+
+    # SQLite: let readers carry on while a write is in progress, and wait for locks rather than failing
+    SQLITE_PRAGMAS = {"journal_mode": "WAL", "synchronous": "NORMAL"}
+    SQLITE_BUSY_TIMEOUT_MS = 5000
+
+    # Required; there is no default, as anything committed here would be public
+    SECRET_KEY = os.environ.get("SECRET_KEY")
+
+    def __init__(self):
+        if not self.SECRET_KEY:
+            raise RuntimeError("The SECRET_KEY environment variable must be set, to run with ProdConfig")
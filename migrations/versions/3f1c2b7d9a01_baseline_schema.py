@@ -0,0 +1,87 @@
+"""Baseline schema, including board size columns
+
+Databases created before migrations were introduced were built by
+db.create_all(). This revision creates any missing tables, and brings older
+tables up to date: board size columns on game, a wider board_state, and
+game_move.position stored as a string (cell numbers beyond the 3x3 board).
+
+Revision ID: 3f1c2b7d9a01
+Revises:
+Create Date: 2026-10-18 13:45:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2b7d9a01'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+
+    if 'player' not in tables:
+        op.create_table(
+            'player',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('name', sa.String(255)),
+            sa.Column('player_type', sa.String(255)),
+            sa.Column('bot_difficulty', sa.String(255)),
+        )
+
+    if 'game' not in tables:
+        op.create_table(
+            'game',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('player_one_id', sa.Integer(), sa.ForeignKey('player.id'), nullable=False),
+            sa.Column('player_two_id', sa.Integer(), sa.ForeignKey('player.id'), nullable=False),
+            sa.Column('status', sa.Enum('IN_PROGRESS', 'FINISHED', name='gamestatus'), nullable=False),
+            sa.Column('next_move_sequence', sa.Integer()),
+            sa.Column('next_move_player_number', sa.Integer()),
+            sa.Column('next_move_player_id', sa.Integer(), sa.ForeignKey('player.id'), nullable=True),
+            sa.Column('board_state', sa.String(255)),
+            sa.Column('board_rows', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('board_cols', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('win_length', sa.Integer(), nullable=False, server_default='3'),
+            sa.Column('winning_player_id', sa.Integer(), sa.ForeignKey('player.id'), nullable=True),
+            sa.Column(
+                'winning_player_number',
+                sa.Enum('PLAYER_ONE', 'PLAYER_TWO', 'TIE', name='winningplayernum'),
+                nullable=True
+            ),
+        )
+    else:
+        columns = {column['name'] for column in inspector.get_columns('game')}
+        for name in ('board_rows', 'board_cols', 'win_length'):
+            if name not in columns:
+                op.add_column('game', sa.Column(name, sa.Integer(), nullable=False, server_default='3'))
+        if op.get_bind().dialect.name != 'sqlite':  # SQLite doesn't enforce string lengths
+            op.alter_column('game', 'board_state', type_=sa.String(255), existing_type=sa.String(9))
+
+    if 'game_move' not in tables:
+        op.create_table(
+            'game_move',
+            sa.Column('id', sa.Integer(), primary_key=True),
+            sa.Column('game_id', sa.Integer(), sa.ForeignKey('game.id'), nullable=False),
+            sa.Column('move_sequence', sa.Integer()),
+            sa.Column('player_number', sa.Integer()),
+            sa.Column('player_id', sa.Integer()),
+            sa.Column('position', sa.String(32)),
+        )
+    elif op.get_bind().dialect.name == 'postgresql':
+        # Previously a native enum of GamePosition names; the names are kept as-is
+        op.alter_column(
+            'game_move', 'position',
+            type_=sa.String(32),
+            postgresql_using='position::text'
+        )
+
+
+def downgrade():
+    # The baseline is not reversible (earlier databases had no migration history)
+    pass
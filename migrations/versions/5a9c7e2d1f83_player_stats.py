@@ -0,0 +1,63 @@
+"""Player stats table
+
+Adds player_stat, the results of each player's finished games by side and
+opponent difficulty, and fills it from the games finished so far (the same
+aggregate as `flask rebuild-player-stats`).
+
+Revision ID: 5a9c7e2d1f83
+Revises: b27e5f913c40
+Create Date: 2026-10-18 16:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a9c7e2d1f83'
+down_revision = 'b27e5f913c40'
+branch_labels = None
+depends_on = None
+
+# Results of a player's finished games as player one (player two is symmetrical)
+BACKFILL_SQL = """
+INSERT INTO player_stat (player_id, player_number, opponent_difficulty, played, won, lost, tied)
+SELECT game.{player}_id, {number}, opponent_difficulty, COUNT(*),
+       SUM(CASE WHEN game.winning_player_number = '{won}' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN game.winning_player_number = '{lost}' THEN 1 ELSE 0 END),
+       SUM(CASE WHEN game.winning_player_number = 'TIE' THEN 1 ELSE 0 END)
+FROM (
+    SELECT game.*,
+           CASE WHEN opponent.player_type = 'computer' THEN COALESCE(opponent.bot_difficulty, 'unknown')
+                ELSE 'human' END AS opponent_difficulty
+    FROM game JOIN player opponent ON opponent.id = game.{opponent}_id
+    WHERE game.status = 'FINISHED'
+) game
+GROUP BY game.{player}_id, opponent_difficulty
+"""
+
+
+def upgrade():
+    if 'player_stat' not in sa.inspect(op.get_bind()).get_table_names():
+        op.create_table(
+            'player_stat',
+            sa.Column('player_id', sa.Integer(), sa.ForeignKey('player.id'), primary_key=True),
+            sa.Column('player_number', sa.Integer(), primary_key=True),
+            sa.Column('opponent_difficulty', sa.String(255), primary_key=True),
+            sa.Column('played', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('won', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('lost', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('tied', sa.Integer(), nullable=False, server_default='0'),
+        )
+        op.create_index('ix_player_stat_won', 'player_stat', ['won'])
+
+    op.execute('DELETE FROM player_stat')
+    op.execute(BACKFILL_SQL.format(player='player_one', opponent='player_two', number=1,
+                                   won='PLAYER_ONE', lost='PLAYER_TWO'))
+    op.execute(BACKFILL_SQL.format(player='player_two', opponent='player_one', number=2,
+                                   won='PLAYER_TWO', lost='PLAYER_ONE'))
+
+
+def downgrade():
+    op.drop_index('ix_player_stat_won', table_name='player_stat')
+    op.drop_table('player_stat')
@@ -0,0 +1,65 @@
+"""Indexes for hot query paths
+
+Adds the indexes declared on the models: game moves by (game_id,
+move_sequence), which is also unique, and game listings by status or player
+then id. Indexes that already exist (e.g. on databases built by
+db.create_all()) are skipped. On PostgreSQL, indexes are built CONCURRENTLY
+so that writes to the tables carry on while they build.
+
+Revision ID: 8d4e6a0b5c12
+Revises: 3f1c2b7d9a01
+Create Date: 2026-10-18 13:50:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d4e6a0b5c12'
+down_revision = '3f1c2b7d9a01'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns, unique)
+INDEXES = [
+    ('ix_game_move_game_id_move_sequence', 'game_move', ['game_id', 'move_sequence'], True),
+    ('ix_game_status_id', 'game', ['status', 'id'], False),
+    ('ix_game_player_one_id_id', 'game', ['player_one_id', 'id'], False),
+    ('ix_game_player_two_id_id', 'game', ['player_two_id', 'id'], False),
+    ('ix_game_next_move_player_id', 'game', ['next_move_player_id'], False),
+    ('ix_game_winning_player_id', 'game', ['winning_player_id'], False),
+]
+
+
+def _existing_indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _online():
+    """CREATE/DROP INDEX CONCURRENTLY must run outside a transaction, on PostgreSQL"""
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade():
+    online = _online()
+    for name, table, columns, unique in INDEXES:
+        if name in _existing_indexes(table):
+            continue
+        if online:
+            with op.get_context().autocommit_block():
+                op.create_index(name, table, columns, unique=unique, postgresql_concurrently=True)
+        else:
+            op.create_index(name, table, columns, unique=unique)
+
+
+def downgrade():
+    online = _online()
+    for name, table, columns, unique in reversed(INDEXES):
+        if name not in _existing_indexes(table):
+            continue
+        if online:
+            with op.get_context().autocommit_block():
+                op.drop_index(name, table_name=table, postgresql_concurrently=True)
+        else:
+            op.drop_index(name, table_name=table)
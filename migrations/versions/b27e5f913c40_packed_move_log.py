@@ -0,0 +1,86 @@
+"""Packed move log on game
+
+Adds game.move_log (the cell number of each move, one byte per move) and
+backfills it from the game_move rows of existing games, so that a game's
+history can be read without querying game_move.
+
+Revision ID: b27e5f913c40
+Revises: 8d4e6a0b5c12
+Create Date: 2026-10-18 15:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b27e5f913c40'
+down_revision = '8d4e6a0b5c12'
+branch_labels = None
+depends_on = None
+
+# game_move.position holds the cell name on the 3x3 board, otherwise the cell number
+POSITION_NAMES = [
+    'TOP_ROW_LEFT_COL', 'TOP_ROW_CENTER_COL', 'TOP_ROW_RIGHT_COL',
+    'MIDDLE_ROW_LEFT_COL', 'MIDDLE_ROW_CENTER_COL', 'MIDDLE_ROW_RIGHT_COL',
+    'BOTTOM_ROW_LEFT_COL', 'BOTTOM_ROW_CENTER_COL', 'BOTTOM_ROW_RIGHT_COL',
+]
+
+# Games read and updated per batch, while backfilling
+BATCH_SIZE = 1000
+
+
+def _cell_number(position):
+    if position in POSITION_NAMES:
+        return POSITION_NAMES.index(position) + 1
+    return int(position)
+
+
+def _backfill(connection):
+    """Fill in the move log of every game without one, BATCH_SIZE games (by id) at a time"""
+    game = sa.table('game', sa.column('id', sa.Integer()), sa.column('move_log', sa.LargeBinary()))
+    game_move = sa.table(
+        'game_move',
+        sa.column('game_id', sa.Integer()),
+        sa.column('move_sequence', sa.Integer()),
+        sa.column('position', sa.String(32)),
+    )
+    update = game.update().where(game.c.id == sa.bindparam('game_id')).values(move_log=sa.bindparam('log'))
+
+    last_id = 0
+    while True:
+        game_ids = connection.execute(
+            sa.select(game.c.id)
+            .where(game.c.move_log.is_(None), game.c.id > last_id)
+            .order_by(game.c.id)
+            .limit(BATCH_SIZE)
+        ).scalars().all()
+        if not game_ids:
+            return
+
+        logs = {game_id: bytearray() for game_id in game_ids}
+        rows = connection.execute(
+            sa.select(game_move.c.game_id, game_move.c.position)
+            .where(game_move.c.game_id.in_(game_ids))
+            .order_by(game_move.c.game_id, game_move.c.move_sequence)
+        )
+        for game_id, position in rows:
+            logs[game_id].append(_cell_number(position))
+
+        connection.execute(update, [{'game_id': game_id, 'log': bytes(log)} for game_id, log in logs.items()])
+        last_id = game_ids[-1]
+
+
+def upgrade():
+    bind = op.get_bind()
+    columns = {column['name'] for column in sa.inspect(bind).get_columns('game')}
+    if 'move_log' not in columns:
+        op.add_column('game', sa.Column('move_log', sa.LargeBinary(255), nullable=True))
+    # Each batch is committed as it's written, so an interrupted backfill resumes
+    # (from the games still without a log) when the upgrade is run again
+    with op.get_context().autocommit_block():
+        _backfill(bind)
+
+
+def downgrade():
+    op.drop_column('game', 'move_log')
@@ -0,0 +1,32 @@
+"""Finish time on game
+
+Adds game.finished_at (indexed, for exports of recently finished games). Games
+that finished before this revision keep a NULL finish time.
+
+Revision ID: e4b8d2a6c917
+Revises: 5a9c7e2d1f83
+Create Date: 2026-10-18 17:20:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b8d2a6c917'
+down_revision = '5a9c7e2d1f83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if 'finished_at' not in {column['name'] for column in inspector.get_columns('game')}:
+        op.add_column('game', sa.Column('finished_at', sa.DateTime(), nullable=True))
+    if 'ix_game_finished_at' not in {index['name'] for index in inspector.get_indexes('game')}:
+        op.create_index('ix_game_finished_at', 'game', ['finished_at'])
+
+
+def downgrade():
+    op.drop_index('ix_game_finished_at', table_name='game')
+    op.drop_column('game', 'finished_at')
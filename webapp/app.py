@@ -1,11 +1,14 @@
 """Flask application factory"""
+import atexit
 import os
 from flask import Flask
 from flask_migrate import Migrate
 
-from webapp.models.base import db
+from webapp.models.base import db, apply_engine_options, configure_engines
 from webapp.models.player import Player
-from webapp.csv_sync import PlayerCsv
+from webapp.csv_sync import PlayerCsv, PlayerCsvWriteBack, DEFAULT_DEBOUNCE_SECONDS
+from webapp.services.bot_executor import bot_executor
+from webapp.services.game_cache import game_cache
 
 
 def create_app(config):
@@ -22,36 +25,53 @@ def create_app(config):
     app.config.from_object(config)
     
     # Initialize database
+    apply_engine_options(app)
     db.init_app(app)
     app.app_context().push()
+    configure_engines(app)
     db.create_all()
     Migrate(app, db)
+    bot_executor.init_app(app)
+    game_cache.init_app(app)
     
     # Initialize player data from CSV if needed
-    _initialize_player_data()
+    _initialize_player_data(app)
     
     # Set up navigation
     _setup_navigation(app)
     
     # Register blueprints
     _register_blueprints(app)
+
+    # Register CLI commands
+    from webapp.commands import check_query_plans, export_games_command, import_players, rebuild_player_stats
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(export_games_command)
+    app.cli.add_command(import_players)
+    app.cli.add_command(rebuild_player_stats)
     
     return app
 
 
-def _initialize_player_data():
+def _initialize_player_data(app):
     """Initialize player data from CSV file if database is empty"""
     csv_filename = 'seed_data_players.csv'
     csv_path = os.path.join(os.path.dirname(__file__), csv_filename)
     player_csv = PlayerCsv(csv_path)
-    existing_data = Player.get_players()
     
-    if not existing_data:
-        player_csv.synchronize_players_from_file()
-        
-        # If the Data has any further updates, write these to the file:
-        # Player.e_added.add_listener(player_csv.synchronize_players_to_file)
-        # Player.e_updated.add_listener(player_csv.synchronize_players_to_file)
+    if not Player.has_players():
+        player_csv.import_players()
+
+    # If the Data has any further updates, write these to the file
+    # (changed rows only, a debounce window at a time, on a background thread):
+    if app.config.get("PLAYER_CSV_WRITE_BACK", False):
+        write_back = PlayerCsvWriteBack(
+            csv_path,
+            debounce_seconds=app.config.get("PLAYER_CSV_DEBOUNCE_SECONDS", DEFAULT_DEBOUNCE_SECONDS),
+            app=app
+        ).listen()
+        # Don't lose the last window's changes on shutdown
+        atexit.register(write_back.flush)
 
 
 def _setup_navigation(app):
@@ -60,7 +80,7 @@ def _setup_navigation(app):
         {"label": "Home", "function": "ui.root"},
         {"label": "New game", "function": "ui.games_new"},
         {"label": "Existing games", "function": "ui.games_get_all"},
-        # {"label": "Statistics", "function": "ui.stats"},
+        {"label": "Statistics", "function": "ui.stats"},
         {"label": "About", "function": "ui.about"},
         {"label": "API Index", "function": "api_index.index"}
     ])
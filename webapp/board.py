@@ -0,0 +1,288 @@
+"""
+Integer bitboard engine for m,n,k games (tic-tac-toe is 3,3,3).
+
+Each player's marks are held as an integer bitmask, where bit ``n`` represents
+cell ``n + 1`` of the board, numbered row by row. ``Game.board_state`` remains
+the persisted (string) form of the board; game logic should work on the masks.
+
+A BoardSpec precomputes every line of ``win_length`` cells, and for each cell
+the lines that pass through it. After a move, only the lines through the cell
+just played need to be checked for a win.
+"""
+
+from functools import lru_cache
+from typing import Iterator, List, Tuple
+
+# Upper limit on board size, so that a cell index always fits in one byte
+MAX_CELLS = 255
+
+# Result codes returned by winner(); these mirror WinningPlayerNum values
+PLAYER_ONE_WINS = 1
+PLAYER_TWO_WINS = 2
+TIE = 3
+
+
+class BoardSpec:
+    """Dimensions and win rule of a board, along with its precomputed line index"""
+
+    __slots__ = (
+        "rows", "cols", "win_length", "cell_count", "full_mask", "cell_bits", "lines", "lines_through"
+    )
+
+    def __init__(self, rows: int, cols: int, win_length: int):
+        if rows < 1 or cols < 1 or rows * cols > MAX_CELLS:
+            raise ValueError(f"Board must have between 1 and {MAX_CELLS} cells")
+        if win_length < 1 or win_length > max(rows, cols):
+            raise ValueError(f"Win length must be between 1 and {max(rows, cols)}")
+
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.cell_count = rows * cols
+        self.full_mask = (1 << self.cell_count) - 1
+        self.cell_bits = tuple(1 << idx for idx in range(self.cell_count))
+
+        lines = []
+        for r in range(rows):
+            for c in range(cols):
+                # Horizontal, vertical, diagonal and anti-diagonal lines starting here
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r = r + dr * (win_length - 1)
+                    end_c = c + dc * (win_length - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        line = 0
+                        for step in range(win_length):
+                            line |= self.cell_bits[(r + dr * step) * cols + (c + dc * step)]
+                        if line not in lines:
+                            lines.append(line)
+        self.lines = tuple(lines)
+        self.lines_through = tuple(
+            tuple(line for line in self.lines if line & bit)
+            for bit in self.cell_bits
+        )
+
+    @property
+    def dimensions(self) -> Tuple[int, int, int]:
+        return self.rows, self.cols, self.win_length
+
+    @property
+    def is_standard(self) -> bool:
+        return self.dimensions == (3, 3, 3)
+
+    def __eq__(self, other):
+        return isinstance(other, BoardSpec) and self.dimensions == other.dimensions
+
+    def __hash__(self):
+        return hash(self.dimensions)
+
+    def to_dict(self) -> dict:
+        return {"rows": self.rows, "cols": self.cols, "win_length": self.win_length}
+
+    def __repr__(self):
+        return "<BoardSpec {}x{} ({} in a row)>".format(self.rows, self.cols, self.win_length)
+
+
+def get_spec(rows: int = 3, cols: int = 3, win_length: int = 3) -> BoardSpec:
+    """Get the (shared) BoardSpec for the given dimensions"""
+    return _get_spec(int(rows), int(cols), int(win_length))
+
+
+@lru_cache(maxsize=None)
+def _get_spec(rows: int, cols: int, win_length: int) -> BoardSpec:
+    return BoardSpec(rows, cols, win_length)
+
+
+def spec_from_params(params) -> BoardSpec:
+    """
+    Read a BoardSpec from request parameters (board_rows, board_cols, win_length).
+
+    Omitted parameters default to the standard board.
+    """
+    return get_spec(
+        params.get('board_rows') or 3,
+        params.get('board_cols') or 3,
+        params.get('win_length') or 3
+    )
+
+
+STANDARD_BOARD = get_spec(3, 3, 3)
+
+# Shortcuts for the standard 3x3 board
+CELL_COUNT = STANDARD_BOARD.cell_count
+FULL_MASK = STANDARD_BOARD.full_mask
+CELL_BITS = STANDARD_BOARD.cell_bits
+WIN_MASKS = STANDARD_BOARD.lines
+
+
+def from_board_state(board_state: str) -> Tuple[int, int]:
+    """
+    Parse a persisted board_state string into a pair of masks.
+
+    Returns:
+        (player one mask, player two mask)
+    """
+    p1 = p2 = 0
+    bit = 1
+    for value in board_state:
+        if value == "1":
+            p1 |= bit
+        elif value == "2":
+            p2 |= bit
+        bit <<= 1
+    return p1, p2
+
+
+def to_board_state(p1: int, p2: int, spec: BoardSpec = STANDARD_BOARD) -> str:
+    """Render a pair of masks as a persisted board_state string"""
+    return "".join(
+        "1" if p1 & bit else "2" if p2 & bit else "0"
+        for bit in spec.cell_bits
+    )
+
+
+def has_won(mask: int, spec: BoardSpec = STANDARD_BOARD) -> bool:
+    """True if the mask contains a complete line"""
+    for line in spec.lines:
+        if mask & line == line:
+            return True
+    return False
+
+
+def has_won_at(mask: int, bit: int, spec: BoardSpec = STANDARD_BOARD) -> bool:
+    """True if the mask contains a complete line through the given cell (i.e. the move just played)"""
+    for line in spec.lines_through[bit.bit_length() - 1]:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winning_lines(mask: int, spec: BoardSpec = STANDARD_BOARD) -> int:
+    """Union of every complete line within the mask"""
+    pieces = 0
+    for line in spec.lines:
+        if mask & line == line:
+            pieces |= line
+    return pieces
+
+
+def winner(p1: int, p2: int, spec: BoardSpec = STANDARD_BOARD) -> int | None:
+    """
+    Determine the result of a board, by checking every line.
+
+    Returns:
+        PLAYER_ONE_WINS, PLAYER_TWO_WINS, TIE, or None if the game continues
+    """
+    if has_won(p1, spec):
+        return PLAYER_ONE_WINS
+    if has_won(p2, spec):
+        return PLAYER_TWO_WINS
+    if p1 | p2 == spec.full_mask:
+        return TIE
+    return None
+
+
+def winner_after_move(p1: int, p2: int, bit: int, spec: BoardSpec = STANDARD_BOARD) -> int | None:
+    """
+    Determine the result of a board, given the move just played (on an unfinished board).
+
+    Only the lines through that cell are checked.
+
+    Returns:
+        PLAYER_ONE_WINS, PLAYER_TWO_WINS, TIE, or None if the game continues
+    """
+    if p1 & bit:
+        if has_won_at(p1, bit, spec):
+            return PLAYER_ONE_WINS
+    elif has_won_at(p2, bit, spec):
+        return PLAYER_TWO_WINS
+    if p1 | p2 == spec.full_mask:
+        return TIE
+    return None
+
+
+def empty_cells(p1: int, p2: int, spec: BoardSpec = STANDARD_BOARD) -> int:
+    """Mask of the cells that are still available"""
+    return spec.full_mask & ~(p1 | p2)
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield each set bit of the mask, lowest first"""
+    while mask:
+        bit = mask & -mask
+        yield bit
+        mask ^= bit
+
+
+def bit_to_position(bit: int) -> int:
+    """Position (1-based cell number) for a single-bit mask"""
+    return bit.bit_length()
+
+
+def mask_to_positions(mask: int) -> List[int]:
+    """Positions (1-based cell numbers) for every set bit of the mask"""
+    return [bit.bit_length() for bit in iter_bits(mask)]
+
+
+class Bitboard:
+    """
+    Mutable board for search and simulation.
+
+    Moves are applied and undone in place, so a bot can explore many lines
+    of play without allocating a new board (or string) per move.
+    """
+
+    __slots__ = ("masks", "player_number", "spec")
+
+    def __init__(self, p1: int = 0, p2: int = 0, player_number: int = 1, spec: BoardSpec = STANDARD_BOARD):
+        # masks[0] is unused, so that masks[player_number] reads naturally
+        self.masks = [0, p1, p2]
+        self.player_number = player_number
+        self.spec = spec
+
+    @classmethod
+    def from_board_state(
+            cls,
+            board_state: str,
+            player_number: int | None = None,
+            spec: BoardSpec = STANDARD_BOARD
+    ) -> "Bitboard":
+        p1, p2 = from_board_state(board_state)
+        if player_number is None:
+            # Player 1 always moves first
+            player_number = 1 if p1.bit_count() == p2.bit_count() else 2
+        return cls(p1, p2, player_number, spec)
+
+    @property
+    def p1(self) -> int:
+        return self.masks[1]
+
+    @property
+    def p2(self) -> int:
+        return self.masks[2]
+
+    def empty_cells(self) -> int:
+        return self.spec.full_mask & ~(self.masks[1] | self.masks[2])
+
+    def play(self, bit: int):
+        """Place the current player's mark on a cell, and pass the turn"""
+        self.masks[self.player_number] |= bit
+        self.player_number = 3 - self.player_number
+
+    def undo(self, bit: int):
+        """Reverse the most recent play() of this cell"""
+        self.player_number = 3 - self.player_number
+        self.masks[self.player_number] &= ~bit
+
+    def is_win_at(self, bit: int) -> bool:
+        """True if the mark on this cell completes a line for its owner"""
+        owner = 1 if self.masks[1] & bit else 2
+        return has_won_at(self.masks[owner], bit, self.spec)
+
+    def winner(self) -> int | None:
+        return winner(self.masks[1], self.masks[2], self.spec)
+
+    def to_board_state(self) -> str:
+        return to_board_state(self.masks[1], self.masks[2], self.spec)
+
+    def __repr__(self):
+        return "<Bitboard '{}' (player {} to move)>".format(self.to_board_state(), self.player_number)
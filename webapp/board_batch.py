@@ -0,0 +1,125 @@
+"""
+Vectorised (NumPy) evaluation of many boards at once, for bulk analysis.
+
+Boards are held as an N x cells uint8 matrix (0 = empty, 1 = player one,
+2 = player two), matching the characters of ``Game.board_state``. Every line
+of the BoardSpec is checked for every board in a handful of array
+operations, rather than one board (and one string) at a time.
+
+Results agree with board.winner(): if both players have a line (which a
+real game can't reach), player one is reported as the winner.
+"""
+
+from functools import lru_cache
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from webapp import board
+
+# Boards are evaluated this many at a time, to bound the size of the
+# intermediate (boards x lines x win_length) arrays
+BATCH_ROWS = 10_000
+
+
+@lru_cache(maxsize=None)
+def line_index(spec: board.BoardSpec) -> np.ndarray:
+    """The cells (0-based) of every line of the board, as a lines x win_length array"""
+    lines = [[bit.bit_length() - 1 for bit in board.iter_bits(line)] for line in spec.lines]
+    index = np.array(lines, dtype=np.intp).reshape(len(lines), spec.win_length)
+    index.flags.writeable = False
+    return index
+
+
+def from_board_states(board_states: Sequence[str], spec: board.BoardSpec = board.STANDARD_BOARD) -> np.ndarray:
+    """Convert board_state strings into an N x cells matrix"""
+    if not board_states:
+        return np.zeros((0, spec.cell_count), dtype=np.uint8)
+    encoded = "".join(board_states).encode("ascii")
+    if len(encoded) != len(board_states) * spec.cell_count:
+        raise ValueError(f"Each board_state must have {spec.cell_count} cells")
+    return (np.frombuffer(encoded, dtype=np.uint8) - ord("0")).reshape(len(board_states), spec.cell_count)
+
+
+def from_masks(masks, spec: board.BoardSpec = board.STANDARD_BOARD) -> np.ndarray:
+    """
+    Convert integer-encoded boards into an N x cells matrix.
+
+    Args:
+        masks: N (player one mask, player two mask) pairs, as for board.from_board_state()
+        spec: The board's dimensions and win rule
+    """
+    masks = list(masks)
+    if not masks:
+        return np.zeros((0, spec.cell_count), dtype=np.uint8)
+    width = (spec.cell_count + 7) // 8
+
+    def unpack(column):
+        packed = b"".join(int(mask).to_bytes(width, "little") for mask in column)
+        bits = np.unpackbits(np.frombuffer(packed, dtype=np.uint8), bitorder="little")
+        return bits.reshape(len(masks), width * 8)[:, :spec.cell_count]
+
+    p1 = unpack(mask[0] for mask in masks)
+    p2 = unpack(mask[1] for mask in masks)
+    if np.any(p1 & p2):
+        raise ValueError("A cell cannot be held by both players")
+    return p1 + 2 * p2
+
+
+class BatchEvaluation(NamedTuple):
+    """
+    Results for N boards.
+
+    winner: int8 array; PLAYER_ONE_WINS, PLAYER_TWO_WINS, TIE, or 0 if the game continues
+    tie: bool array
+    legal: N x cells bool matrix of playable cells (none, once a game is over)
+    """
+    winner: np.ndarray
+    tie: np.ndarray
+    legal: np.ndarray
+
+    def legal_masks(self) -> list[int]:
+        """The legal moves of each board, as an integer cell mask"""
+        packed = np.packbits(self.legal, axis=1, bitorder="little")
+        return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+def evaluate(boards, spec: board.BoardSpec = board.STANDARD_BOARD) -> BatchEvaluation:
+    """
+    Find the winner, tie flag and legal moves of many boards at once.
+
+    Args:
+        boards: An N x cells matrix (uint8: 0, 1 or 2), or N (p1 mask, p2 mask) pairs
+        spec: The board's dimensions and win rule (shared by every board)
+
+    Returns:
+        BatchEvaluation
+    """
+    if isinstance(boards, np.ndarray) and boards.ndim == 2 and boards.shape[1] == spec.cell_count:
+        cells = boards.astype(np.uint8, copy=False)
+    else:
+        cells = from_masks(boards, spec)
+
+    if cells.shape[0] and cells.max() > 2:
+        raise ValueError("Cells must be 0 (empty), 1 or 2")
+
+    index = line_index(spec)
+    winner = np.zeros(cells.shape[0], dtype=np.int8)
+    for start in range(0, cells.shape[0], BATCH_ROWS):
+        lines = cells[start:start + BATCH_ROWS][:, index]  # rows x lines x win_length
+        p1_wins = (lines == 1).all(axis=2).any(axis=1)
+        p2_wins = (lines == 2).all(axis=2).any(axis=1)
+        winner[start:start + BATCH_ROWS] = np.where(
+            p1_wins, board.PLAYER_ONE_WINS, np.where(p2_wins, board.PLAYER_TWO_WINS, 0)
+        )
+
+    empty = cells == 0
+    tie = (winner == 0) & ~empty.any(axis=1)
+    winner[tie] = board.TIE
+    legal = empty & (winner == 0)[:, None]
+    return BatchEvaluation(winner, tie, legal)
+
+
+def evaluate_board_states(board_states: Sequence[str], spec: board.BoardSpec = board.STANDARD_BOARD) -> BatchEvaluation:
+    """evaluate(), for a sequence of board_state strings (e.g. Game.board_state values)"""
+    return evaluate(from_board_states(board_states, spec), spec)
@@ -3,13 +3,15 @@ Bots module for automated game players and strategies
 """
 
 from webapp.bots.strategy import BotStrategy
-from webapp.bots.difficulties import EasyBot, MediumBot, HardBot, ExpertBot
+from webapp.bots.difficulties import EasyBot, MediumBot, HardBot, ExpertBot, MasterBot, GrandmasterBot
 from webapp.bots.factory import get_bot_strategy
 from webapp.bots.config import (
     DIFFICULTY_EASY,
     DIFFICULTY_MEDIUM,
     DIFFICULTY_HARD,
     DIFFICULTY_EXPERT,
+    DIFFICULTY_MASTER,
+    DIFFICULTY_GRANDMASTER,
     AVAILABLE_DIFFICULTIES,
     DEFAULT_DIFFICULTY
 )
@@ -23,6 +25,8 @@ __all__ = [
     'MediumBot',
     'HardBot',
     'ExpertBot',
+    'MasterBot',
+    'GrandmasterBot',
     
     # Factory
     'get_bot_strategy',
@@ -32,6 +36,8 @@ __all__ = [
     'DIFFICULTY_MEDIUM',
     'DIFFICULTY_HARD',
     'DIFFICULTY_EXPERT',
+    'DIFFICULTY_MASTER',
+    'DIFFICULTY_GRANDMASTER',
     'AVAILABLE_DIFFICULTIES',
     'DEFAULT_DIFFICULTY',
 ]
\ No newline at end of file
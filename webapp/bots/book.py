@@ -0,0 +1,157 @@
+"""
+Opening book: precomputed bot knowledge, as a compact binary file.
+
+Books are memory-mapped and binary-searched in place, rather than loaded into
+Python objects, so startup costs next to nothing and forked workers share the
+same (page cache) copy of the file.
+
+File layout (all integers big-endian):
+
+    header:  magic "TTTB", version (u8), rows, cols, win_length (u8 each),
+             record count (u32)
+    records: sorted by key; each is
+             key    p1 mask then p2 mask, ceil(cells / 8) bytes each
+             value  game-theoretic value for the player to move (i8)
+             moves  mask of the best moves, ceil(cells / 8) bytes
+
+Since both masks have a fixed width, comparing keys as bytes orders them the
+same as comparing (p1, p2) numerically.
+
+Regenerate the shipped book with: python -m webapp.bots.book
+"""
+
+import bisect
+import mmap
+import os
+import struct
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Tuple
+
+from webapp import board
+
+MAGIC = b"TTTB"
+VERSION = 1
+_HEADER = struct.Struct(">4sBBBBI")
+
+DATA_DIRECTORY = os.path.join(os.path.dirname(__file__), "data")
+
+
+class BookEntry(NamedTuple):
+    """A book position; `moves` is a mask of cells"""
+    value: int
+    moves: int
+
+
+def book_path(spec: board.BoardSpec) -> str:
+    return os.path.join(DATA_DIRECTORY, "book_{}x{}x{}.bin".format(*spec.dimensions))
+
+
+def _mask_bytes(spec: board.BoardSpec) -> int:
+    return (spec.cell_count + 7) // 8
+
+
+def _key(p1: int, p2: int, width: int) -> bytes:
+    return p1.to_bytes(width, "big") + p2.to_bytes(width, "big")
+
+
+class _Keys:
+    """Sequence view of the record keys, for bisect"""
+
+    def __init__(self, book: "OpeningBook"):
+        self._book = book
+
+    def __len__(self):
+        return self._book.record_count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._book.records_offset + index * self._book.record_size
+        return self._book.data[start:start + self._book.key_size]
+
+
+class OpeningBook:
+    """A memory-mapped book file, for one BoardSpec"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, rows, cols, win_length, record_count = _HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a (version {VERSION}) opening book")
+
+        self.path = path
+        self.spec = board.get_spec(rows, cols, win_length)
+        self.record_count = record_count
+        self.mask_size = _mask_bytes(self.spec)
+        self.key_size = 2 * self.mask_size
+        self.record_size = self.key_size + 1 + self.mask_size
+        self.records_offset = _HEADER.size
+        if len(self.data) != self.records_offset + record_count * self.record_size:
+            raise ValueError(f"{path} is truncated or corrupt")
+        self._keys = _Keys(self)
+
+    def __len__(self):
+        return self.record_count
+
+    def lookup(self, p1: int, p2: int) -> BookEntry | None:
+        """
+        Look up a position.
+
+        Args:
+            p1: Player one's mask
+            p2: Player two's mask
+
+        Returns:
+            BookEntry, or None if the position is not in the book
+        """
+        key = _key(p1, p2, self.mask_size)
+        index = bisect.bisect_left(self._keys, key)
+        if index == self.record_count or self._keys[index] != key:
+            return None
+
+        start = self.records_offset + index * self.record_size + self.key_size
+        value = struct.unpack_from(">b", self.data, start)[0]
+        moves = int.from_bytes(self.data[start + 1:start + 1 + self.mask_size], "big")
+        return BookEntry(value, moves)
+
+
+@lru_cache(maxsize=None)
+def get_book(spec: board.BoardSpec = board.STANDARD_BOARD) -> OpeningBook | None:
+    """The (shared) opening book for a board, or None if there isn't one"""
+    path = book_path(spec)
+    if not os.path.exists(path):
+        return None
+    return OpeningBook(path)
+
+
+def write_book(path: str, spec: board.BoardSpec, entries: Iterable[Tuple[int, int, int, int]]) -> int:
+    """
+    Write an opening book file.
+
+    Args:
+        path: File to write (replaced atomically)
+        spec: The board's dimensions and win rule
+        entries: (p1 mask, p2 mask, value, moves mask) for each position
+
+    Returns:
+        The number of records written
+    """
+    width = _mask_bytes(spec)
+    records = sorted(
+        _key(p1, p2, width) + struct.pack(">b", value) + moves.to_bytes(width, "big")
+        for p1, p2, value, moves in entries
+    )
+
+    temporary_path = path + ".tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, spec.rows, spec.cols, spec.win_length, len(records)))
+        file.writelines(records)
+    os.replace(temporary_path, path)
+    return len(records)
+
+
+if __name__ == "__main__":
+    from webapp.bots.solver import iter_book_entries
+
+    written = write_book(book_path(board.STANDARD_BOARD), board.STANDARD_BOARD, iter_book_entries())
+    print(f"Wrote {written} positions to {book_path(board.STANDARD_BOARD)}")
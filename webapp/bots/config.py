@@ -4,13 +4,37 @@ DIFFICULTY_EASY = "easy"
 DIFFICULTY_MEDIUM = "medium"
 DIFFICULTY_HARD = "hard"
 DIFFICULTY_EXPERT = "expert"
+DIFFICULTY_MASTER = "master"
+DIFFICULTY_GRANDMASTER = "grandmaster"
 
 AVAILABLE_DIFFICULTIES = [
     DIFFICULTY_EASY,
     DIFFICULTY_MEDIUM,
     DIFFICULTY_HARD,
     DIFFICULTY_EXPERT,
+    DIFFICULTY_MASTER,
+    DIFFICULTY_GRANDMASTER,
 ]
 
 # Default difficulty if none specified or invalid difficulty provided
-DEFAULT_DIFFICULTY = DIFFICULTY_EASY
\ No newline at end of file
+DEFAULT_DIFFICULTY = DIFFICULTY_EASY
+
+# Maximum number of positions held in the shared transposition table
+TRANSPOSITION_TABLE_MAX_ENTRIES = 100_000
+
+# Search limits for the master (alpha-beta) bot. The time budget is a hard
+# ceiling on each move, whatever the board size; None means no depth limit.
+MASTER_TIME_BUDGET_SECONDS = 0.5
+MASTER_MAX_DEPTH = None
+
+# Limits for the grandmaster (Monte-Carlo Tree Search) bot. A move ends at
+# whichever of the playout or time budget runs out first. Each tree is capped
+# at GRANDMASTER_MAX_TREE_NODES nodes. Search trees are kept between turns (up
+# to GRANDMASTER_MAX_STORED_TREES games), and the least recently stored are
+# dropped once they hold more than GRANDMASTER_MAX_STORED_NODES nodes in all
+# (per process, so each bot executor process has its own).
+GRANDMASTER_PLAYOUTS = 5000
+GRANDMASTER_TIME_BUDGET_SECONDS = 1.0
+GRANDMASTER_MAX_TREE_NODES = 50_000
+GRANDMASTER_MAX_STORED_TREES = 256
+GRANDMASTER_MAX_STORED_NODES = 200_000
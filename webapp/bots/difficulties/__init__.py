@@ -4,10 +4,14 @@ from webapp.bots.difficulties.easy import EasyBot
 from webapp.bots.difficulties.medium import MediumBot
 from webapp.bots.difficulties.hard import HardBot
 from webapp.bots.difficulties.expert import ExpertBot
+from webapp.bots.difficulties.master import MasterBot
+from webapp.bots.difficulties.grandmaster import GrandmasterBot
 
 __all__ = [
     'EasyBot',
     'MediumBot',
     'HardBot',
     'ExpertBot',
+    'MasterBot',
+    'GrandmasterBot',
 ]
\ No newline at end of file
@@ -2,6 +2,7 @@ import random
 from webapp.helpers import GamePosition
 from webapp.models.game import Game
 from webapp.bots.strategy import BotStrategy
+from webapp.bots.utils import positions_from_mask
 
 
 class EasyBot(BotStrategy):
@@ -17,5 +18,5 @@ class EasyBot(BotStrategy):
         Returns:
             A randomly selected valid GamePosition
         """
-        valid_positions = game.get_valid_next_positions()
-        return random.choice(valid_positions)
\ No newline at end of file
+        bitboard = game.get_bitboard()
+        return random.choice(positions_from_mask(bitboard.empty_cells(), bitboard.spec))
\ No newline at end of file
@@ -0,0 +1,281 @@
+import math
+import random
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import List, Tuple
+from webapp import board
+from webapp.helpers import GamePosition
+from webapp.models.game import Game
+from webapp.bots.strategy import BotStrategy
+from webapp.bots.config import (
+    GRANDMASTER_PLAYOUTS,
+    GRANDMASTER_TIME_BUDGET_SECONDS,
+    GRANDMASTER_MAX_TREE_NODES,
+    GRANDMASTER_MAX_STORED_TREES,
+    GRANDMASTER_MAX_STORED_NODES
+)
+from webapp.bots.utils import winning_cells, nearby_cells, positions_from_mask
+
+EXPLORATION = math.sqrt(2)
+
+# Boards up to this size consider every empty cell; larger boards only
+# expand cells next to those already played
+FULL_WIDTH_MAX_CELLS = 25
+NEIGHBOURHOOD_RADIUS = 1
+
+
+@dataclass
+class MctsStats:
+    """Statistics for the most recent search"""
+    playouts: int = 0
+    tree_nodes: int = 0
+    reused_tree: bool = False
+    elapsed: float = 0.0
+
+
+class _Node:
+    """
+    A node of the search tree.
+
+    `player` is the player who made the move (`bit`) leading to this node;
+    `score` is accumulated from their point of view.
+    """
+
+    __slots__ = ("bit", "player", "parent", "children", "untried", "visits", "score", "winner")
+
+    def __init__(self, bit: int, player: int, parent, untried: int, winner: int | None = None):
+        self.bit = bit
+        self.player = player
+        self.parent = parent
+        self.children: List["_Node"] = []
+        self.untried = untried
+        self.visits = 0
+        self.score = 0.0
+        self.winner = winner
+
+
+class GrandmasterBot(BotStrategy):
+    """
+    Grandmaster difficulty bot - uses Monte-Carlo Tree Search.
+
+    Strategy:
+    1. Take winning move if available
+    2. Block opponent's winning move (if there is only one)
+    3. Otherwise, grow a search tree (UCT) using random playouts on a
+       bitboard, until the playout or time budget runs out, and play the
+       most visited move.
+
+    The subtree below the chosen move is kept, keyed by game id and
+    next_move_sequence, so the game's next turn carries on from it.
+    Statistics for the most recent search are kept in `last_search`.
+    """
+
+    # Trees kept between turns: (game id, move sequence) -> (p1, p2, root node, node count)
+    _stored_trees: OrderedDict = OrderedDict()
+    _stored_nodes = 0
+    _stored_trees_lock = threading.Lock()
+
+    def __init__(
+            self,
+            playouts: int = GRANDMASTER_PLAYOUTS,
+            time_budget: float = GRANDMASTER_TIME_BUDGET_SECONDS,
+            max_tree_nodes: int = GRANDMASTER_MAX_TREE_NODES
+    ):
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.max_tree_nodes = max_tree_nodes
+        self.last_search = MctsStats()
+
+    def calculate_next_move(self, game: Game) -> GamePosition:
+        """
+        Calculate next move using grandmaster-level strategy.
+
+        Args:
+            game: The current game state
+
+        Returns:
+            The most promising GamePosition found within the budget
+        """
+        bitboard = game.get_bitboard()
+        root = self._reuse_tree(game.id, game.next_move_sequence, bitboard) if game.id else None
+        bit, child = self.search(bitboard, root)
+
+        if game.id and child is not None and child.winner is None:
+            self._store_tree(game.id, game.next_move_sequence + 1, bitboard, child)
+
+        return positions_from_mask(bit, bitboard.spec)[0]
+
+    def search(self, bitboard: board.Bitboard, root: _Node | None = None) -> Tuple[int, _Node | None]:
+        """
+        Search for the best move.
+
+        Args:
+            bitboard: The position to search; it is left unchanged
+            root: Optional tree (from an earlier search) for this position
+
+        Returns:
+            (chosen cell as a single-bit mask, tree node for the chosen move)
+        """
+        started = time.perf_counter()
+        deadline = started + self.time_budget
+        self.last_search = MctsStats(reused_tree=root is not None)
+        spec = bitboard.spec
+        player_number = bitboard.player_number
+        empty = bitboard.empty_cells()
+
+        # 1. Check for winning moves
+        winning = winning_cells(bitboard.masks[player_number], empty, spec)
+        if winning:
+            return random.choice(list(board.iter_bits(winning))), None
+
+        # 2. Check for (a single) blocking move
+        blocking = winning_cells(bitboard.masks[3 - player_number], empty, spec)
+        if blocking and blocking & (blocking - 1) == 0:
+            return blocking, None
+
+        # 3. Monte-Carlo Tree Search
+        root_p1, root_p2 = bitboard.p1, bitboard.p2
+        if root is None:
+            root = _Node(0, 3 - player_number, None, self._candidates(bitboard))
+        # Each playout adds at most one node, so this is an upper bound on the tree's size
+        tree_nodes = root.visits + 1
+
+        scratch = board.Bitboard(root_p1, root_p2, player_number, spec)
+        playouts = 0
+        while playouts < self.playouts and time.perf_counter() < deadline:
+            scratch.masks[1], scratch.masks[2], scratch.player_number = root_p1, root_p2, player_number
+            node = root
+
+            # Selection
+            while not node.untried and node.children and node.winner is None:
+                node = self._select_child(node)
+                scratch.play(node.bit)
+
+            # Expansion
+            if node.winner is None and node.untried and tree_nodes < self.max_tree_nodes:
+                bit = random.choice(list(board.iter_bits(node.untried)))
+                node.untried ^= bit
+                scratch.play(bit)
+                winner = None
+                if scratch.is_win_at(bit):
+                    winner = 3 - scratch.player_number
+                elif not scratch.empty_cells():
+                    winner = board.TIE
+                child = _Node(bit, 3 - scratch.player_number, node, 0 if winner else self._candidates(scratch), winner)
+                node.children.append(child)
+                node = child
+                tree_nodes += 1
+
+            # Simulation
+            result = node.winner if node.winner is not None else self._playout(scratch)
+
+            # Backpropagation
+            while node is not None:
+                node.visits += 1
+                if result == node.player:
+                    node.score += 1
+                elif result == board.TIE:
+                    node.score += 0.5
+                node = node.parent
+            playouts += 1
+
+        self.last_search.playouts = playouts
+        self.last_search.tree_nodes = tree_nodes
+        self.last_search.elapsed = time.perf_counter() - started
+
+        if not root.children:
+            # No time for even one playout; fall back to any candidate
+            return random.choice(list(board.iter_bits(root.untried or empty))), None
+        best = max(root.children, key=lambda child: child.visits)
+        return best.bit, best
+
+    def _candidates(self, bitboard: board.Bitboard) -> int:
+        """Moves worth expanding from this position"""
+        empty = bitboard.empty_cells()
+        occupied = bitboard.masks[1] | bitboard.masks[2]
+        if bitboard.spec.cell_count <= FULL_WIDTH_MAX_CELLS or not occupied:
+            return empty
+        return nearby_cells(occupied, empty, bitboard.spec, NEIGHBOURHOOD_RADIUS)
+
+    @staticmethod
+    def _select_child(node: _Node) -> _Node:
+        """Upper Confidence Bound (UCB1) selection"""
+        log_visits = math.log(node.visits)
+        best = None
+        best_value = -1.0
+        for child in node.children:
+            value = child.score / child.visits + EXPLORATION * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    @staticmethod
+    def _playout(bitboard: board.Bitboard) -> int:
+        """Play random moves to the end of the game (without changing `bitboard`)"""
+        lines_through = bitboard.spec.lines_through
+        masks = [0, bitboard.masks[1], bitboard.masks[2]]
+        player = bitboard.player_number
+        cells = list(board.iter_bits(bitboard.empty_cells()))
+        random.shuffle(cells)
+        for bit in cells:
+            mask = masks[player] | bit
+            masks[player] = mask
+            for line in lines_through[bit.bit_length() - 1]:
+                if mask & line == line:
+                    return player
+            player = 3 - player
+        return board.TIE
+
+    @classmethod
+    def _store_tree(cls, game_id: int, move_sequence: int, bitboard: board.Bitboard, node: _Node):
+        """Keep the subtree for the move played, so the game's next turn can reuse it"""
+        node.parent = None
+        masks = [0, bitboard.p1, bitboard.p2]
+        masks[bitboard.player_number] |= node.bit
+        # Each playout through the node added at most one node below it
+        node_count = node.visits + 1
+        key = (game_id, move_sequence)
+        with cls._stored_trees_lock:
+            replaced = cls._stored_trees.pop(key, None)
+            if replaced:
+                cls._stored_nodes -= replaced[3]
+            cls._stored_trees[key] = (masks[1], masks[2], node, node_count)
+            cls._stored_nodes += node_count
+            while cls._stored_trees and (
+                    len(cls._stored_trees) > GRANDMASTER_MAX_STORED_TREES
+                    or cls._stored_nodes > GRANDMASTER_MAX_STORED_NODES
+            ):
+                cls._stored_nodes -= cls._stored_trees.popitem(last=False)[1][3]
+
+    @classmethod
+    def _reuse_tree(cls, game_id: int, move_sequence: int, bitboard: board.Bitboard) -> _Node | None:
+        """
+        Find a stored tree for this position.
+
+        The stored tree is either for this exact position (when this bot also
+        made the previous move), or for the position one move earlier, in
+        which case the subtree for the opponent's reply is used.
+        """
+        with cls._stored_trees_lock:
+            exact = cls._stored_trees.pop((game_id, move_sequence), None)
+            previous = cls._stored_trees.pop((game_id, move_sequence - 1), None)
+            cls._stored_nodes -= sum(stored[3] for stored in (exact, previous) if stored)
+
+        if exact:
+            p1, p2, node, _ = exact
+            if (p1, p2) == (bitboard.p1, bitboard.p2):
+                return node
+
+        if previous:
+            p1, p2, node, _ = previous
+            if p1 & ~bitboard.p1 or p2 & ~bitboard.p2:
+                return None  # Not an earlier state of this board
+            reply = (bitboard.p1 | bitboard.p2) ^ (p1 | p2)
+            for child in node.children:
+                if child.bit == reply:
+                    child.parent = None
+                    return child
+        return None
@@ -2,12 +2,7 @@ import random
 from webapp.helpers import GamePosition
 from webapp.models.game import Game
 from webapp.bots.strategy import BotStrategy
-from webapp.bots.utils import (
-    get_winning_moves,
-    get_blocking_moves,
-    get_center_positions,
-    get_corner_positions
-)
+from webapp.bots.utils import evaluate_tactics, positions_from_mask, center_mask, corner_mask, TACTICS_NAMESPACE
 
 
 class HardBot(BotStrategy):
@@ -32,28 +27,25 @@ class HardBot(BotStrategy):
         Returns:
             A strategically selected GamePosition
         """
-        player_number = game.next_move_player_number
-        
-        # 1. Check for winning moves
-        winning_moves = get_winning_moves(game.board_state, player_number)
-        if winning_moves:
-            return random.choice(winning_moves)
-        
+        bitboard = game.get_bitboard()
+        spec = bitboard.spec
+        empty = bitboard.empty_cells()
+
+        # 1. Check for winning moves, then
         # 2. Check for blocking moves
-        blocking_moves = get_blocking_moves(game.board_state, player_number)
-        if blocking_moves:
-            return random.choice(blocking_moves)
-        
+        tactics = self.cached_evaluation(bitboard, evaluate_tactics, TACTICS_NAMESPACE)
+        if tactics.moves:
+            return random.choice(positions_from_mask(tactics.moves, spec))
+
         # 3. Try to take center
-        center_positions = get_center_positions(game.board_state)
+        center_positions = empty & center_mask(spec)
         if center_positions:
-            return center_positions[0]
-        
+            return positions_from_mask(center_positions, spec)[0]
+
         # 4. Try to take corners
-        corner_positions = get_corner_positions(game.board_state)
+        corner_positions = empty & corner_mask(spec)
         if corner_positions:
-            return random.choice(corner_positions)
-        
+            return random.choice(positions_from_mask(corner_positions, spec))
+
         # 5. Random valid move
-        valid_positions = game.get_valid_next_positions()
-        return random.choice(valid_positions)
\ No newline at end of file
+        return random.choice(positions_from_mask(empty, spec))
@@ -0,0 +1,251 @@
+import random
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Tuple
+from webapp import board
+from webapp.helpers import GamePosition
+from webapp.models.game import Game
+from webapp.bots.strategy import BotStrategy
+from webapp.bots.config import MASTER_TIME_BUDGET_SECONDS, MASTER_MAX_DEPTH
+from webapp.bots.utils import winning_cells, center_mask, nearby_cells, positions_from_mask
+
+WIN_SCORE = 1_000_000
+INFINITY = WIN_SCORE + 1
+
+# Transposition entry flags
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# How often (in nodes) the clock is checked
+CLOCK_CHECK_INTERVAL = 128
+
+# Boards up to this size consider every empty cell; larger boards only
+# consider cells near those already played
+FULL_WIDTH_MAX_CELLS = 25
+NEIGHBOURHOOD_RADIUS = 2
+
+
+@dataclass
+class SearchStats:
+    """Statistics for the most recent search"""
+    nodes: int = 0
+    depth: int = 0
+    score: int = 0
+    elapsed: float = 0.0
+    timed_out: bool = False
+
+
+class _SearchTimeout(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def _line_weights(spec: board.BoardSpec) -> Tuple[int, ...]:
+    """Heuristic value of an open line, indexed by the number of marks in it"""
+    return tuple(8 ** count if count else 0 for count in range(spec.win_length + 1))
+
+
+class MasterBot(BotStrategy):
+    """
+    Master difficulty bot - searches ahead with alpha-beta negamax.
+
+    Strategy:
+    1. Take winning move if available
+    2. Block opponent's winning move (if there is only one)
+    3. Take the only candidate move, if there is just one
+    4. Otherwise, iterative-deepening negamax with alpha-beta pruning, within
+       a per-move time budget. Moves are ordered by the previous iteration's
+       best move, then by a history heuristic. Positions beyond the search
+       horizon are scored by counting open lines.
+
+    Statistics for the most recent search are kept in `last_search`.
+    """
+
+    def __init__(self, time_budget: float = MASTER_TIME_BUDGET_SECONDS, max_depth: int | None = MASTER_MAX_DEPTH):
+        self.time_budget = time_budget
+        self.max_depth = max_depth
+        self.last_search = SearchStats()
+
+    def calculate_next_move(self, game: Game) -> GamePosition:
+        """
+        Calculate next move using master-level strategy.
+
+        Args:
+            game: The current game state
+
+        Returns:
+            The best GamePosition found within the time budget
+        """
+        bitboard = game.get_bitboard()
+        bit = self.search(bitboard)
+        return positions_from_mask(bit, bitboard.spec)[0]
+
+    def search(self, bitboard: board.Bitboard) -> int:
+        """
+        Search for the best move.
+
+        Args:
+            bitboard: The position to search; it is left unchanged
+
+        Returns:
+            The chosen cell, as a single-bit mask
+        """
+        started = time.perf_counter()
+        self.last_search = SearchStats()
+        spec = bitboard.spec
+        player_number = bitboard.player_number
+        empty = bitboard.empty_cells()
+
+        # 1. Check for winning moves
+        winning = winning_cells(bitboard.masks[player_number], empty, spec)
+        if winning:
+            return random.choice(list(board.iter_bits(winning)))
+
+        # 2. Check for (a single) blocking move
+        blocking = winning_cells(bitboard.masks[3 - player_number], empty, spec)
+        if blocking and blocking & (blocking - 1) == 0:
+            return blocking
+
+        # Search state (the history heuristic also orders the root moves)
+        self._bitboard = board.Bitboard(bitboard.p1, bitboard.p2, player_number, spec)
+        self._deadline = started + self.time_budget
+        self._nodes = 0
+        self._table: Dict[Tuple[int, int], Tuple[int, int, int, int]] = {}
+        self._history: Dict[int, int] = {}
+
+        root_moves = self._ordered_moves(empty, None)
+        # 3. Only one candidate (e.g. the centre of an empty board); nothing to compare it with
+        if len(root_moves) == 1:
+            self.last_search.elapsed = time.perf_counter() - started
+            return root_moves[0]
+
+        # 4. Iterative deepening
+        best_bit = root_moves[0]
+        best_score = 0
+        depth_limit = empty.bit_count()
+        if self.max_depth:
+            depth_limit = min(depth_limit, self.max_depth)
+
+        depth = 0
+        try:
+            for depth in range(1, depth_limit + 1):
+                best_score, best_bit = self._search_root(root_moves, depth)
+                self.last_search.depth = depth
+                # Search the best move first at the next depth
+                root_moves.remove(best_bit)
+                root_moves.insert(0, best_bit)
+                if abs(best_score) >= WIN_SCORE - depth_limit:
+                    break  # Forced result found; searching deeper won't change it
+        except _SearchTimeout:
+            self.last_search.timed_out = True
+
+        self.last_search.nodes = self._nodes
+        self.last_search.score = best_score
+        self.last_search.elapsed = time.perf_counter() - started
+        return best_bit
+
+    def _search_root(self, root_moves: List[int], depth: int) -> Tuple[int, int]:
+        alpha = -INFINITY
+        best_bit = root_moves[0]
+        for bit in root_moves:
+            self._bitboard.play(bit)
+            score = -self._negamax(depth - 1, -INFINITY, -alpha, 1, bit)
+            self._bitboard.undo(bit)
+            if score > alpha:
+                alpha = score
+                best_bit = bit
+        return alpha, best_bit
+
+    def _negamax(self, depth: int, alpha: int, beta: int, ply: int, last_bit: int) -> int:
+        self._nodes += 1
+        if self._nodes % CLOCK_CHECK_INTERVAL == 0 and time.perf_counter() > self._deadline:
+            raise _SearchTimeout()
+
+        bitboard = self._bitboard
+        if bitboard.is_win_at(last_bit):
+            # The opponent's last move won; sooner losses score lower
+            return ply - WIN_SCORE
+        empty = bitboard.empty_cells()
+        if not empty:
+            return 0  # Tie
+        if depth == 0:
+            return self._evaluate()
+
+        key = (bitboard.masks[1], bitboard.masks[2])
+        entry = self._table.get(key)
+        table_bit = None
+        if entry:
+            entry_depth, entry_score, entry_flag, table_bit = entry
+            if entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_bit = None
+        for bit in self._ordered_moves(empty, table_bit):
+            bitboard.play(bit)
+            score = -self._negamax(depth - 1, -beta, -alpha, ply + 1, bit)
+            bitboard.undo(bit)
+            if score > best_score:
+                best_score = score
+                best_bit = bit
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._history[bit] = self._history.get(bit, 0) + depth * depth
+                break
+
+        if best_score <= original_alpha:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._table[key] = (depth, best_score, flag, best_bit)
+        return best_score
+
+    def _ordered_moves(self, empty: int, first_bit: int | None) -> List[int]:
+        """Candidate moves, best first"""
+        bitboard = self._bitboard
+        spec = bitboard.spec
+        occupied = bitboard.masks[1] | bitboard.masks[2]
+
+        if not occupied:
+            candidates = empty & center_mask(spec)
+        elif spec.cell_count <= FULL_WIDTH_MAX_CELLS:
+            candidates = empty
+        else:
+            candidates = nearby_cells(occupied, empty, spec, NEIGHBOURHOOD_RADIUS)
+
+        history = self._history
+        moves = sorted(board.iter_bits(candidates), key=lambda b: history.get(b, 0), reverse=True)
+        if first_bit in moves:
+            moves.remove(first_bit)
+            moves.insert(0, first_bit)
+        return moves
+
+    def _evaluate(self) -> int:
+        """Heuristic score of a quiet position, for the player to move"""
+        bitboard = self._bitboard
+        own = bitboard.masks[bitboard.player_number]
+        opponent = bitboard.masks[3 - bitboard.player_number]
+        weights = _line_weights(bitboard.spec)
+        score = 0
+        for line in bitboard.spec.lines:
+            own_marks = own & line
+            opponent_marks = opponent & line
+            if own_marks:
+                if not opponent_marks:
+                    score += weights[own_marks.bit_count()]
+            elif opponent_marks:
+                score -= weights[opponent_marks.bit_count()]
+        return score
@@ -2,12 +2,14 @@
 
 from typing import Dict, Type
 from webapp.bots.strategy import BotStrategy
-from webapp.bots.difficulties import EasyBot, MediumBot, HardBot, ExpertBot
+from webapp.bots.difficulties import EasyBot, MediumBot, HardBot, ExpertBot, MasterBot, GrandmasterBot
 from webapp.bots.config import (
     DIFFICULTY_EASY,
     DIFFICULTY_MEDIUM,
     DIFFICULTY_HARD,
     DIFFICULTY_EXPERT,
+    DIFFICULTY_MASTER,
+    DIFFICULTY_GRANDMASTER,
     DEFAULT_DIFFICULTY
 )
 
@@ -17,7 +19,7 @@ def get_bot_strategy(difficulty: str = DEFAULT_DIFFICULTY) -> BotStrategy:
     Factory function to get appropriate bot strategy based on difficulty.
     
     Args:
-        difficulty: The difficulty level ("easy", "medium", "hard", or "expert")
+        difficulty: The difficulty level ("easy", "medium", "hard", "expert", "master" or "grandmaster")
         
     Returns:
         BotStrategy: An instance of the appropriate bot strategy
@@ -32,6 +34,8 @@ def get_bot_strategy(difficulty: str = DEFAULT_DIFFICULTY) -> BotStrategy:
         DIFFICULTY_MEDIUM: MediumBot,
         DIFFICULTY_HARD: HardBot,
         DIFFICULTY_EXPERT: ExpertBot,
+        DIFFICULTY_MASTER: MasterBot,
+        DIFFICULTY_GRANDMASTER: GrandmasterBot,
     }
     
     if(difficulty):
@@ -0,0 +1,113 @@
+"""Solved game table for 3x3 tic-tac-toe
+
+Every position reachable from the empty board is solved once (full minimax).
+Bots don't use this table directly at request time: it is written out as the
+opening book (see webapp.bots.book), which bots memory-map instead.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterator, NamedTuple, Tuple
+from webapp import board
+from webapp.helpers import GamePosition
+
+
+# Game-theoretic values, from the perspective of the player about to move
+VALUE_WIN = 1
+VALUE_DRAW = 0
+VALUE_LOSS = -1
+
+
+class SolvedPosition(NamedTuple):
+    """Solved entry for a position where a move is still to be made"""
+    value: int
+    optimal_moves: Tuple[GamePosition, ...]
+
+
+def build_solved_table() -> Dict[str, SolvedPosition]:
+    """
+    Solve every reachable, unfinished position.
+
+    Optimal moves are those with the best game-theoretic value; among these,
+    wins are preferred when they come sooner, and losses when they come later.
+
+    Returns:
+        Dict mapping board_state strings to their SolvedPosition
+    """
+    table: Dict[str, SolvedPosition] = {}
+    scores: Dict[Tuple[int, int], int] = {}
+    bitboard = board.Bitboard()
+
+    def solve() -> int:
+        # Returns a depth-adjusted score for the player to move
+        key = (bitboard.p1, bitboard.p2)
+        if key in scores:
+            return scores[key]
+
+        player_number = bitboard.player_number
+        empty = bitboard.empty_cells()
+        move_scores = {}
+        for bit in board.iter_bits(empty):
+            bitboard.play(bit)
+            if board.has_won(bitboard.masks[player_number]):
+                # Winning sooner (more empty cells left) scores higher
+                move_scores[bit] = (empty ^ bit).bit_count() + 1
+            elif empty == bit:
+                move_scores[bit] = 0  # Tie
+            else:
+                move_scores[bit] = -solve()
+            bitboard.undo(bit)
+
+        best_score = max(move_scores.values())
+        if best_score > 0:
+            value = VALUE_WIN
+        elif best_score < 0:
+            value = VALUE_LOSS
+        else:
+            value = VALUE_DRAW
+
+        table[bitboard.to_board_state()] = SolvedPosition(
+            value=value,
+            optimal_moves=tuple(
+                GamePosition(board.bit_to_position(bit))
+                for bit, score in move_scores.items() if score == best_score
+            )
+        )
+        scores[key] = best_score
+        return best_score
+
+    solve()
+    return table
+
+
+@lru_cache(maxsize=None)
+def get_solved_table() -> Dict[str, SolvedPosition]:
+    """The solved table, built on first use"""
+    return build_solved_table()
+
+
+def iter_book_entries() -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yield every solved position in opening book form.
+
+    Returns:
+        Iterator of (p1 mask, p2 mask, value, mask of optimal moves)
+    """
+    for board_state, solved in get_solved_table().items():
+        p1, p2 = board.from_board_state(board_state)
+        moves = 0
+        for position in solved.optimal_moves:
+            moves |= board.CELL_BITS[position - 1]
+        yield p1, p2, solved.value, moves
+
+
+def lookup(board_state: str) -> SolvedPosition | None:
+    """
+    Look up a solved position (building the table on first use).
+
+    Args:
+        board_state: The current game's board_state
+
+    Returns:
+        SolvedPosition, or None if the position is finished or unreachable
+    """
+    return get_solved_table().get(board_state)
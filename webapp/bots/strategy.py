@@ -1,12 +1,18 @@
 
 from abc import ABC, abstractmethod
+from typing import Callable, Hashable
+from webapp.board import Bitboard, BoardSpec
 from webapp.helpers import GamePosition
 from webapp.models.game import Game
+from webapp.bots.transposition import TranspositionEntry, TranspositionTable, shared_table
 
 
 class BotStrategy(ABC):
     """Base class for bot move calculation strategies"""
-    
+
+    # Shared by all strategies (and all games) within this process
+    transposition_table: TranspositionTable = shared_table
+
     @abstractmethod
     def calculate_next_move(self, game: Game) -> GamePosition:
         """
@@ -18,4 +24,30 @@ class BotStrategy(ABC):
         Returns:
             GamePosition: The position where the bot chooses to move
         """
-        pass
\ No newline at end of file
+        pass
+
+    def cached_evaluation(
+            self,
+            bitboard: Bitboard,
+            evaluate: Callable[[int, int, int, BoardSpec], TranspositionEntry],
+            namespace: Hashable = None
+    ) -> TranspositionEntry:
+        """
+        Evaluate a position through the shared transposition table.
+
+        Args:
+            bitboard: The position to evaluate
+            evaluate: Called as evaluate(p1, p2, player_number, spec) on a cache miss
+            namespace: Identifies the kind of evaluation; defaults to the strategy's class name
+
+        Returns:
+            TranspositionEntry, with moves oriented to match `bitboard`
+        """
+        return self.transposition_table.lookup(
+            namespace or type(self).__name__,
+            bitboard.p1,
+            bitboard.p2,
+            bitboard.player_number,
+            evaluate,
+            bitboard.spec
+        )
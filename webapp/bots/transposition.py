@@ -0,0 +1,195 @@
+"""
+Symmetry-aware transposition table, shared by all bot strategies.
+
+A square board has 8 dihedral symmetries (4 rotations, each optionally
+mirrored); a rectangular board has 4. Positions are stored under the canonical
+form of the board plus the side to move, so a position that is a rotation or
+reflection of one already evaluated is a cache hit. Cached move masks are
+stored in the canonical orientation, and mapped back to the caller's
+orientation on the way out.
+"""
+
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Hashable, NamedTuple, Tuple
+
+from webapp import board
+from webapp.bots.config import TRANSPOSITION_TABLE_MAX_ENTRIES
+
+# Masks are transformed a chunk of cells at a time, via lookup tables
+_CHUNK_CELLS = 9
+_CHUNK_MASK = (1 << _CHUNK_CELLS) - 1
+
+
+def _cell_permutations(spec: board.BoardSpec) -> Tuple[Tuple[int, ...], ...]:
+    """For each symmetry of the board, the destination index of every cell (row-major, 0-based)"""
+    rows, cols = spec.rows, spec.cols
+    if rows == cols:
+        def transforms(r, c):
+            n = rows - 1
+            return (
+                (r, c), (c, n - r), (n - r, n - c), (n - c, r),
+                (r, n - c), (n - c, n - r), (n - r, c), (c, r),
+            )
+    else:
+        def transforms(r, c):
+            return (r, c), (rows - 1 - r, cols - 1 - c), (r, cols - 1 - c), (rows - 1 - r, c)
+
+    cells = [transforms(*divmod(idx, cols)) for idx in range(spec.cell_count)]
+    return tuple(
+        tuple(r * cols + c for r, c in (cell[symmetry] for cell in cells))
+        for symmetry in range(len(cells[0]))
+    )
+
+
+class _Symmetries:
+    """Transform tables for every symmetry of one BoardSpec"""
+
+    def __init__(self, spec: board.BoardSpec):
+        self.spec = spec
+        self.permutations = _cell_permutations(spec)
+
+        # tables[s][chunk][value] is the transformed mask of those cells
+        self.tables = []
+        for perm in self.permutations:
+            chunks = []
+            for start in range(0, spec.cell_count, _CHUNK_CELLS):
+                width = min(_CHUNK_CELLS, spec.cell_count - start)
+                chunk = []
+                for value in range(1 << width):
+                    transformed = 0
+                    for offset in range(width):
+                        if value >> offset & 1:
+                            transformed |= spec.cell_bits[perm[start + offset]]
+                    chunk.append(transformed)
+                chunks.append(tuple(chunk))
+            self.tables.append(tuple(chunks))
+
+        # inverse[s] is the symmetry that undoes symmetry s
+        self.inverse = tuple(
+            self.permutations.index(tuple(perm.index(idx) for idx in range(spec.cell_count)))
+            for perm in self.permutations
+        )
+
+    def transform(self, mask: int, symmetry: int) -> int:
+        transformed = 0
+        for chunk in self.tables[symmetry]:
+            transformed |= chunk[mask & _CHUNK_MASK]
+            mask >>= _CHUNK_CELLS
+        return transformed
+
+    def canonicalise(self, p1: int, p2: int) -> Tuple[int, int, int]:
+        best = None
+        best_symmetry = 0
+        shift = self.spec.cell_count
+        for symmetry in range(len(self.tables)):
+            candidate = (self.transform(p1, symmetry) << shift) | self.transform(p2, symmetry)
+            if best is None or candidate < best:
+                best = candidate
+                best_symmetry = symmetry
+        return best >> shift, best & self.spec.full_mask, best_symmetry
+
+
+@lru_cache(maxsize=None)
+def _symmetries(spec: board.BoardSpec) -> _Symmetries:
+    return _Symmetries(spec)
+
+
+def canonicalise(p1: int, p2: int, spec: board.BoardSpec = board.STANDARD_BOARD) -> Tuple[int, int, int]:
+    """
+    Find the canonical orientation of a board.
+
+    Returns:
+        (canonical p1 mask, canonical p2 mask, index of the symmetry applied)
+    """
+    return _symmetries(spec).canonicalise(p1, p2)
+
+
+class TranspositionEntry(NamedTuple):
+    """Cached evaluation; `moves` is a mask of cells"""
+    value: int
+    moves: int
+
+
+class TranspositionTable:
+    """
+    Bounded LRU cache of position evaluations, keyed on canonical boards.
+
+    Entries are namespaced (e.g. by strategy), so different kinds of analysis
+    can share the one table without colliding.
+    """
+
+    def __init__(self, max_entries: int = TRANSPOSITION_TABLE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(
+            self,
+            namespace: Hashable,
+            p1: int,
+            p2: int,
+            player_number: int,
+            evaluate: Callable[[int, int, int, board.BoardSpec], TranspositionEntry],
+            spec: board.BoardSpec = board.STANDARD_BOARD
+    ) -> TranspositionEntry:
+        """
+        Return the evaluation of a position, computing it on a miss.
+
+        Args:
+            namespace: Identifies the kind of evaluation being cached
+            p1: Player one's mask
+            p2: Player two's mask
+            player_number: The side to move
+            evaluate: Called as evaluate(p1, p2, player_number, spec) with the canonical
+                board on a miss; must return a TranspositionEntry
+            spec: The board's dimensions and win rule
+
+        Returns:
+            TranspositionEntry, with moves in the caller's orientation
+        """
+        symmetries = _symmetries(spec)
+        canonical_p1, canonical_p2, symmetry = symmetries.canonicalise(p1, p2)
+        key = (namespace, spec, canonical_p1, canonical_p2, player_number)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+
+        if entry is None:
+            entry = evaluate(canonical_p1, canonical_p2, player_number, spec)
+            with self._lock:
+                self.misses += 1
+                self._entries[key] = entry
+                if len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        return TranspositionEntry(entry.value, symmetries.transform(entry.moves, symmetries.inverse[symmetry]))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+# One table per process, shared by every BotStrategy
+shared_table = TranspositionTable()
@@ -1,49 +1,162 @@
 """Utility functions for bot move calculations"""
 
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
+from webapp import board
 from webapp.helpers import GamePosition
-from webapp.models.game import Game
+from webapp.bots.transposition import TranspositionEntry
+
+
+CENTER_MASK = board.CELL_BITS[4]
+EDGE_MASK = board.CELL_BITS[1] | board.CELL_BITS[3] | board.CELL_BITS[5] | board.CELL_BITS[7]
+CORNER_MASK = board.CELL_BITS[0] | board.CELL_BITS[2] | board.CELL_BITS[6] | board.CELL_BITS[8]
+
+
+def center_mask(spec: board.BoardSpec = board.STANDARD_BOARD) -> int:
+    """Mask of the center cell(s); boards with an even dimension have more than one"""
+    rows = {(spec.rows - 1) // 2, spec.rows // 2}
+    cols = {(spec.cols - 1) // 2, spec.cols // 2}
+    mask = 0
+    for r in rows:
+        for c in cols:
+            mask |= spec.cell_bits[r * spec.cols + c]
+    return mask
+
+
+def corner_mask(spec: board.BoardSpec = board.STANDARD_BOARD) -> int:
+    """Mask of the corner cells"""
+    last_row = (spec.rows - 1) * spec.cols
+    return (
+        spec.cell_bits[0] | spec.cell_bits[spec.cols - 1]
+        | spec.cell_bits[last_row] | spec.cell_bits[last_row + spec.cols - 1]
+    )
+
+
+@lru_cache(maxsize=None)
+def neighbourhoods(spec: board.BoardSpec, radius: int) -> Tuple[int, ...]:
+    """For each cell, a mask of the cells within `radius` rows/columns of it"""
+    masks = []
+    for idx in range(spec.cell_count):
+        r, c = divmod(idx, spec.cols)
+        mask = 0
+        for nr in range(max(0, r - radius), min(spec.rows, r + radius + 1)):
+            for nc in range(max(0, c - radius), min(spec.cols, c + radius + 1)):
+                mask |= spec.cell_bits[nr * spec.cols + nc]
+        masks.append(mask)
+    return tuple(masks)
+
+
+def nearby_cells(occupied: int, empty: int, spec: board.BoardSpec, radius: int = 2) -> int:
+    """
+    Mask of empty cells within `radius` of an occupied cell.
+
+    On large boards, moves far from any existing mark are rarely worth
+    considering; this keeps the branching factor of a search manageable.
+    Falls back to every empty cell if none are nearby.
+    """
+    cells = neighbourhoods(spec, radius)
+    nearby = 0
+    for bit in board.iter_bits(occupied):
+        nearby |= cells[bit.bit_length() - 1]
+    return empty & nearby or empty
+
+
+def winning_cells(own: int, empty: int, spec: board.BoardSpec = board.STANDARD_BOARD) -> int:
+    """
+    Mask of empty cells that would complete a line for the owner of `own`.
+
+    Args:
+        own: Mask of the player's marks
+        empty: Mask of the available cells
+        spec: The board's dimensions and win rule
+
+    Returns:
+        Mask of winning cells
+    """
+    cells = 0
+    for line in spec.lines:
+        missing = line & ~own
+        # Exactly one cell missing from the line, and it is available
+        if missing and missing & (missing - 1) == 0 and missing & empty:
+            cells |= missing
+    return cells
+
+
+# Transposition table namespace (and values) for evaluate_tactics()
+TACTICS_NAMESPACE = "tactics"
+TACTIC_WIN = 1
+TACTIC_BLOCK = -1
+TACTIC_NONE = 0
+
+
+def evaluate_tactics(
+        p1: int,
+        p2: int,
+        player_number: int,
+        spec: board.BoardSpec = board.STANDARD_BOARD
+) -> TranspositionEntry:
+    """
+    Find the immediate tactical moves for the player to move.
+
+    Suitable for BotStrategy.cached_evaluation().
+
+    Returns:
+        TranspositionEntry of (TACTIC_WIN, winning cells), (TACTIC_BLOCK, blocking cells),
+        or (TACTIC_NONE, 0)
+    """
+    empty = board.empty_cells(p1, p2, spec)
+    own, opponent = (p1, p2) if player_number == 1 else (p2, p1)
+
+    winning = winning_cells(own, empty, spec)
+    if winning:
+        return TranspositionEntry(TACTIC_WIN, winning)
+
+    blocking = winning_cells(opponent, empty, spec)
+    if blocking:
+        return TranspositionEntry(TACTIC_BLOCK, blocking)
+
+    return TranspositionEntry(TACTIC_NONE, 0)
+
+
+def positions_from_mask(mask: int, spec: board.BoardSpec = board.STANDARD_BOARD) -> List[int]:
+    """Positions for every set bit of the mask; GamePosition members on the standard board"""
+    if spec.is_standard:
+        return [GamePosition(pos) for pos in board.mask_to_positions(mask)]
+    return board.mask_to_positions(mask)
 
 
 def get_winning_moves(board_state: str, player_number: int) -> List[GamePosition]:
     """
     Find moves that would win the game for the specified player.
-    
+
     Args:
-        game: The current game state
+        board_state: The current game's board_state
         player_number: The player number to check winning moves for (1 or 2)
-        
+
     Returns:
         List of GamePosition objects that would result in a win
     """
-    winning_moves = []
-    valid_positions = Game.valid_next_positions(board_state)
-    
-    for position in valid_positions:
-        # Simulate the move
-        simulated_state = simulate_move(board_state, player_number, position)
-        if is_winning_state(simulated_state, player_number):
-            winning_moves.append(position)
-    
-    return winning_moves
+    masks = board.from_board_state(board_state)
+    empty = board.empty_cells(*masks)
+    return positions_from_mask(winning_cells(masks[player_number - 1], empty))
 
 
 def get_blocking_moves(board_state: str, player_number: int) -> List[GamePosition]:
     """
     Find moves that would block the opponent from winning on their next turn.
-    
+
     Args:
-        game: The current game state
+        board_state: The current game's board_state
         player_number: The player number making the blocking move (1 or 2)
-        
+
     Returns:
         List of GamePosition objects that would block opponent's win
     """
     opponent_number = 2 if player_number == 1 else 1
-    
+
     # Find opponent's winning moves
     opponent_winning_moves = get_winning_moves(board_state, opponent_number)
-    
+
     return opponent_winning_moves
 
 
@@ -51,50 +164,38 @@ def get_center_positions(board_state: str) -> List[GamePosition]:
     """
     Return center positions that are still available for strategic play.
     Assumes a 3x3 tic-tac-toe board where position 5 is center.
-    
+
     Args:
-        game: The current game state
-        
+        board_state: The current game's board_state
+
     Returns:
         List of center GamePosition objects that are available
     """
-    valid_positions = Game.valid_next_positions(board_state)
-    
-    # For a 3x3 board, center is position 5 (assuming 1-9 numbering)
-    # Adjust this based on your actual GamePosition enum values
-    center_position = GamePosition(5)
-    
-    if center_position in valid_positions:
-        return [center_position]
-    return []
-def get_edge_positions(board_state: str) -> List[GamePosition]:
+    empty = board.empty_cells(*board.from_board_state(board_state))
+    return positions_from_mask(empty & CENTER_MASK)
+
 
+def get_edge_positions(board_state: str) -> List[GamePosition]:
     """
     Return edge positions that are still available for strategic play.
     Assumes a 3x3 tic-tac-toe board where positions 2,4,6,8 are edges.
-    
+
     Args:
-        game: The current game state
+        board_state: The current game's board_state
+
     Returns:
         List of edge GamePosition objects that are available
     """
-    valid_positions = Game.valid_next_positions(board_state)
-    
-    # For a 3x3 board, edges are positions 2, 4, 6, 8
-    # Adjust this based on your actual GamePosition enum values
-    edge_values = [2, 4, 6, 8]
-    edges = [GamePosition(val) for val in edge_values]
-    
-    available_edges = [pos for pos in edges if pos in valid_positions]
-    return available_edges
-
-def is_a_corner(pos:int)->int:  
+    empty = board.empty_cells(*board.from_board_state(board_state))
+    return positions_from_mask(empty & EDGE_MASK)
+
+def is_a_corner(pos:int)->int:
     return pos in [1, 3, 7, 9]
 
-def is_an_edge(pos:int)->int:  
+def is_an_edge(pos:int)->int:
     return pos in [2, 4, 6, 8]
 
-def is_middle(pos:int)->int:  
+def is_middle(pos:int)->int:
     return pos in [5]
 
 def get_opposite_corner(pos:int)->int:
@@ -105,56 +206,46 @@ def get_corner_positions(board_state: str) -> List[GamePosition]:
     """
     Return corner positions that are still available for strategic play.
     Assumes a 3x3 tic-tac-toe board where positions 1,3,7,9 are corners.
-    
+
     Args:
-        game: The current game state
-        
+        board_state: The current game's board_state
+
     Returns:
         List of corner GamePosition objects that are available
     """
-    valid_positions = Game.valid_next_positions(board_state)
-    
-    # For a 3x3 board, corners are positions 1, 3, 7, 9
-    # Adjust this based on your actual GamePosition enum values
-    corner_values = [1, 3, 7, 9]
-    corners = [GamePosition(val) for val in corner_values]
-    
-    available_corners = [pos for pos in corners if pos in valid_positions]
-    return available_corners
+    empty = board.empty_cells(*board.from_board_state(board_state))
+    return positions_from_mask(empty & CORNER_MASK)
 
 
-def simulate_move(board_state: str, player_number: int, position: GamePosition) -> Game:
+def simulate_move(board_state: str, player_number: int, position: GamePosition) -> str:
     """
     Simulate a move without modifying the actual game state.
-    
+
+    Prefer board.Bitboard.play()/undo() when exploring many moves, as this
+    function has to build a new board_state string.
+
     Args:
         board_state: The current game's board_state
         player_number: The player making the move
         position: The position to move to
-        
+
     Returns:
-        A new Game object with the simulated move applied
+        A new board_state string with the simulated move applied
     """
-    # Create a new board state string
-    chars_before = position.value - 1
-    chars_after = position.value
-    new_board_state = board_state[0:chars_before] + str(player_number) + board_state[chars_after:]
-    return new_board_state
+    masks = list(board.from_board_state(board_state))
+    masks[player_number - 1] |= board.CELL_BITS[int(position) - 1]
+    return board.to_board_state(*masks)
 
 
 def is_winning_state(board_state: str, player_number: int) -> bool:
     """
     Check if the game is in a winning state for the specified player.
-    
+
     Args:
-        game: The game state to check
+        board_state: The current game's board_state
         player_number: The player number to check for win
-        
+
     Returns:
         True if the player has won, False otherwise
     """
-    result = Game.check_for_winner(board_state)
-    if(result):
-        if(result.value == player_number):
-            return True
-    return False
\ No newline at end of file
+    return board.has_won(board.from_board_state(board_state)[player_number - 1])
@@ -0,0 +1,120 @@
+"""Flask CLI commands (run as: flask --app flask_app <command>)"""
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from webapp.csv_sync import IMPORT_CHUNK_SIZE, PlayerCsv
+from webapp.helpers import GameStatus
+from webapp.models.base import db
+from webapp.models.game import Game
+from webapp.models.game_move import GameMove
+from webapp.models.player_stat import PlayerStat
+from webapp.services.game_export import EXPORT_FORMATS, ExportFilter, export_games
+
+
+def _hot_queries():
+    """(description, query) for each query that must be served by an index"""
+    player_id = 1
+    return [
+        (
+            "Last move of a game",
+            GameMove.query.filter(GameMove.game_id == 1).order_by(GameMove.move_sequence.desc()).limit(1)
+        ),
+        (
+            "Moves of a game, in sequence",
+            GameMove.query.filter(GameMove.game_id == 1).order_by(GameMove.move_sequence)
+        ),
+        (
+            "Games by status (next page)",
+            Game.query.filter(Game.status == GameStatus.IN_PROGRESS, Game.id < 1000).order_by(Game.id.desc()).limit(30)
+        ),
+        (
+            "Games by player (next page)",
+            Game.query.filter(
+                db.or_(Game.player_one_id == player_id, Game.player_two_id == player_id), Game.id < 1000
+            ).order_by(Game.id.desc()).limit(30)
+        ),
+        (
+            "Games won by a player",
+            Game.query.filter(Game.winning_player_id == player_id)
+        ),
+        (
+            "A player's stats",
+            PlayerStat.query.filter(PlayerStat.player_id == player_id)
+        ),
+    ]
+
+
+def _full_scans(connection, sql: str) -> list[str]:
+    """Plan steps that read a whole table, for the current dialect"""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        steps = [row[-1] for row in connection.execute(text("EXPLAIN QUERY PLAN " + sql))]
+        return [step for step in steps if step.startswith("SCAN ") and " INDEX " not in step]
+    if dialect == "postgresql":
+        # Small tables are always cheapest to scan; ask whether an index *could* serve the query
+        connection.execute(text("SET LOCAL enable_seqscan = off"))
+        steps = [row[0] for row in connection.execute(text("EXPLAIN " + sql))]
+        return [step.strip() for step in steps if "Seq Scan" in step]
+    if dialect in ("mysql", "mariadb"):
+        rows = connection.execute(text("EXPLAIN " + sql)).mappings()
+        return [f"full scan of {row['table']}" for row in rows if row["type"] == "ALL"]
+    raise click.ClickException(f"Query plans can't be checked on {dialect}")
+
+
+@click.command("check-query-plans")
+@with_appcontext
+def check_query_plans():
+    """Check that each hot query is served by an index (rather than a full table scan)"""
+    failures = 0
+    with db.engine.connect() as connection:
+        for description, query in _hot_queries():
+            sql = str(query.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+            with connection.begin():
+                scans = _full_scans(connection, sql)
+            if scans:
+                failures += 1
+                click.echo(f"FAIL  {description}: " + "; ".join(scans))
+            else:
+                click.echo(f"ok    {description}")
+
+    if failures:
+        raise click.ClickException(f"{failures} hot queries would scan a whole table")
+
+
+@click.command("rebuild-player-stats")
+@with_appcontext
+def rebuild_player_stats():
+    """Recompute the player stats table from all finished games"""
+    rows = PlayerStat.rebuild()
+    click.echo(f"Rebuilt player stats ({rows} rows)")
+
+
+@click.command("export-games")
+@click.option("--format", "export_format", type=click.Choice(list(EXPORT_FORMATS)), default="ndjson")
+@click.option("--output", type=click.File("w"), default="-", help="File to write (default: stdout)")
+@click.option("--finished-after", help="Only games finished after this (ISO 8601, UTC) timestamp")
+@click.option("--min-id", type=int, help="Lowest game id to export")
+@click.option("--max-id", type=int, help="Highest game id to export")
+@with_appcontext
+def export_games_command(export_format, output, finished_after, min_id, max_id):
+    """Write every game, with its moves, as NDJSON or CSV (streamed in batches)"""
+    try:
+        export_filter = ExportFilter.from_params(
+            {"finished_after": finished_after, "min_id": min_id, "max_id": max_id}
+        )
+    except ValueError as err:
+        raise click.BadParameter(err.args[0])
+    for chunk in export_games(export_format, export_filter):
+        output.write(chunk)
+
+
+@click.command("import-players")
+@click.argument("csv_file", type=click.Path(exists=True, dir_okay=False))
+@click.option("--chunk-size", type=click.IntRange(min=1), default=IMPORT_CHUNK_SIZE, help="Rows per commit")
+@with_appcontext
+def import_players(csv_file, chunk_size):
+    """Upsert players from a CSV file (columns: id, name, player_type, bot_difficulty; id is optional)"""
+    report = PlayerCsv(csv_file).import_players(chunk_size)
+    click.echo(f"Imported {report}")
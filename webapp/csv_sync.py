@@ -1,7 +1,68 @@
 import csv
+import logging
 import os
+import shutil
+import tempfile
+import threading
+import time
+from itertools import islice
+from typing import NamedTuple
+
 from webapp.models.player import Player
 
+logger = logging.getLogger(__name__)
+
+# Rows read, upserted and committed at a time, by import_players()
+IMPORT_CHUNK_SIZE = 5000
+
+# Seconds of player changes that PlayerCsvWriteBack collects into one write
+DEFAULT_DEBOUNCE_SECONDS = 2.0
+
+CSV_HEADER = ['id', 'name', 'player_type', 'bot_difficulty']
+
+PLAYER_TYPES = ("human", "computer")
+
+
+class ImportReport(NamedTuple):
+    """Outcome of PlayerCsv.import_players()"""
+    rows: int
+    inserted: int
+    updated: int
+    skipped: int
+    chunks: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> dict:
+        return {**self._asdict(), "rows_per_second": round(self.rows_per_second, 1)}
+
+    def __str__(self):
+        return (f"{self.rows} rows ({self.inserted} inserted, {self.updated} updated, {self.skipped} skipped) "
+                f"in {self.chunks} chunks, {self.seconds:.2f}s ({self.rows_per_second:,.0f} rows/s)")
+
+
+def _player_row(csv_row: dict) -> dict | None:
+    """A Player.bulk_upsert() row from a CSV row, or None if the row isn't a valid player"""
+    name = (csv_row.get("name") or "").strip()
+    player_type = (csv_row.get("player_type") or "").strip()
+    if not name or player_type not in PLAYER_TYPES:
+        return None
+    row = {
+        "name": name,
+        "player_type": player_type,
+        "bot_difficulty": (csv_row.get("bot_difficulty") or "").strip() or None,
+    }
+    player_id = (csv_row.get("id") or "").strip()
+    if player_id:
+        if not player_id.isdigit():
+            return None
+        row["id"] = int(player_id)
+    return row
+
+
 class PlayerCsv:
     csv_filename : str
 
@@ -28,6 +89,35 @@ class PlayerCsv:
         else:
             return []
 
+    def import_players(self, chunk_size: int = IMPORT_CHUNK_SIZE) -> ImportReport:
+        """
+        Stream the file into the database, upserting players a chunk at a time.
+
+        Rows are matched to existing players by id (where given), otherwise by name.
+        Each chunk is written with bulk statements and one commit, and posts one
+        Player.e_bulk_upserted event; rows without a name or a valid player_type are skipped.
+
+        Args:
+            chunk_size: Rows per chunk
+
+        Returns:
+            ImportReport, including rows per second
+        """
+        started = time.perf_counter()
+        rows = inserted = updated = skipped = chunks = 0
+        if self.csv_filename:
+            with open(self.csv_filename, "r", newline="") as csvfile:
+                reader = csv.DictReader(csvfile)
+                while chunk := list(islice(reader, chunk_size)):
+                    player_rows = [row for row in map(_player_row, chunk) if row]
+                    chunk_inserted, chunk_updated = Player.bulk_upsert(player_rows)
+                    rows += len(chunk)
+                    inserted += chunk_inserted
+                    updated += chunk_updated
+                    skipped += len(chunk) - len(player_rows)
+                    chunks += 1
+        return ImportReport(rows, inserted, updated, skipped, chunks, time.perf_counter() - started)
+
     def synchronize_players_to_file(self, updated_data):
         # To keep things simple, we are just going to get all players from DB
         # (and forgo any attempt at delta processing)
@@ -41,4 +131,130 @@ class PlayerCsv:
                 if player:
                     writer.writerow([player.id, player.name, player.player_type, player.bot_difficulty])
 
-        return True
\ No newline at end of file
+        return True
+
+
+class PlayerCsvWriteBack:
+    """
+    Writes player changes back to a CSV file, off the request thread.
+
+    Changes are collected from Player events; debounce_seconds after the first
+    change, all changes so far are written together, on a timer thread: the file
+    is copied to a temporary file with the changed rows patched and rows of new
+    players added at the end, which then replaces it (atomically, with os.replace),
+    so readers never see a half-written row. Players are never all re-read from
+    the database.
+    """
+
+    def __init__(self, csv_filename: str, debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS, app=None):
+        self.csv_filename = csv_filename
+        self.debounce_seconds = debounce_seconds
+        self.app = app
+        self.writes = 0
+        self._changes: dict[int, list] = {}
+        self._check_new_players = False
+        self._file_ids: set[int] | None = None
+        self._timer: threading.Timer | None = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+    def listen(self):
+        """Subscribe to Player change events"""
+        Player.e_added.add_listener(self.on_player_changed)
+        Player.e_updated.add_listener(self.on_player_changed)
+        Player.e_bulk_upserted.add_listener(self.on_players_upserted)
+        return self
+
+    def on_player_changed(self, player: Player):
+        if player is not None:
+            self._record({player.id: [player.id, player.name, player.player_type, player.bot_difficulty]})
+
+    def on_players_upserted(self, rows: list[dict]):
+        changes = {
+            row["id"]: [row["id"], row["name"], row["player_type"], row["bot_difficulty"]]
+            for row in rows if row.get("id") is not None
+        }
+        # Rows inserted without an id are found (by id, after those in the file) when writing
+        self._record(changes, check_new_players=len(changes) < len(rows))
+
+    def _record(self, changes: dict, check_new_players: bool = False):
+        with self._lock:
+            self._changes.update(changes)
+            self._check_new_players |= check_new_players
+            if self._timer is None:
+                self._timer = threading.Timer(self.debounce_seconds, self._flush_in_background)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_in_background(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Writing player changes to %s failed", self.csv_filename)
+
+    def flush(self):
+        """Write the changes collected so far (also called at the end of each debounce window)"""
+        with self._write_lock:
+            with self._lock:
+                changes, self._changes = self._changes, {}
+                check_new_players, self._check_new_players = self._check_new_players, False
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+
+            file_ids = self._read_file_ids()
+            if check_new_players:
+                changes.update(self._players_after(max(file_ids | changes.keys(), default=0)))
+            if not changes:
+                return
+
+            self._patch(changes)
+            file_ids.update(changes)
+            self.writes += 1
+
+    def _read_file_ids(self) -> set[int]:
+        """IDs of the players in the file (read once; kept up to date after each write)"""
+        if self._file_ids is None:
+            self._file_ids = set()
+            if os.path.exists(self.csv_filename):
+                with open(self.csv_filename, "r", newline="") as csvfile:
+                    reader = csv.reader(csvfile)
+                    next(reader, None)
+                    self._file_ids = {int(row[0]) for row in reader if row and row[0].isdigit()}
+        return self._file_ids
+
+    def _players_after(self, player_id: int) -> dict:
+        with self.app.app_context():
+            rows = Player.query.with_entities(
+                Player.id, Player.name, Player.player_type, Player.bot_difficulty
+            ).filter(Player.id > player_id)
+            return {row[0]: list(row) for row in rows}
+
+    def _patch(self, changes: dict):
+        """Replace the file with a copy in which the changed rows are updated (and new rows added)"""
+        remaining = dict(changes)
+        directory = os.path.dirname(os.path.abspath(self.csv_filename))
+        fd, temp_filename = tempfile.mkstemp(dir=directory, prefix=".players-", suffix=".csv")
+        try:
+            with os.fdopen(fd, "w", newline="") as target:
+                writer = csv.writer(target)
+                if os.path.exists(self.csv_filename):
+                    shutil.copymode(self.csv_filename, temp_filename)
+                    with open(self.csv_filename, "r", newline="") as source:
+                        reader = csv.reader(source)
+                        writer.writerow(next(reader, None) or CSV_HEADER)
+                        for row in reader:
+                            if row and row[0].isdigit() and int(row[0]) in remaining:
+                                row = remaining.pop(int(row[0]))
+                            writer.writerow(row)
+                else:
+                    writer.writerow(CSV_HEADER)
+                writer.writerows(remaining[player_id] for player_id in sorted(remaining))
+                target.flush()
+                os.fsync(target.fileno())
+            os.replace(temp_filename, self.csv_filename)
+        except BaseException:
+            if os.path.exists(temp_filename):
+                os.unlink(temp_filename)
+            raise
+
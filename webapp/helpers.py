@@ -1,5 +1,7 @@
+import base64
+import binascii
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import Enum, IntEnum
 
 from flask import url_for
 
@@ -34,7 +36,8 @@ class WinningPlayerNum(Enum):
     TIE = 3
 
 
-class GamePosition(Enum):
+class GamePosition(IntEnum):
+    # Named cells of the standard 3x3 board. Larger boards use plain (1-based) cell numbers.
     TOP_ROW_LEFT_COL = 1
     TOP_ROW_CENTER_COL = 2
     TOP_ROW_RIGHT_COL = 3
@@ -44,3 +47,17 @@ class GamePosition(Enum):
     BOTTOM_ROW_LEFT_COL = 7
     BOTTOM_ROW_CENTER_COL = 8
     BOTTOM_ROW_RIGHT_COL = 9
+
+
+def encode_cursor(last_id: int) -> str:
+    """Opaque pagination token, marking the last row of a page"""
+    return base64.urlsafe_b64encode(str(int(last_id)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Read the last row's ID back from a pagination token"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeError, ValueError):
+        raise ValueError("Invalid cursor")
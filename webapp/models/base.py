@@ -1,16 +1,117 @@
+from contextlib import contextmanager
+
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy import event as sql_event
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
 
 from webapp.event import Event as Event
 from webapp.helpers import GameStatus, WinningPlayerNum, GamePosition
 
 db = SQLAlchemy()
 
+# Bind key of the optional read-only engine (SQLALCHEMY_READONLY_DATABASE_URI)
+READONLY_BIND = "readonly"
+
+# Instruct SQLite to enforce FK constraints (unless configured otherwise):
+DEFAULT_SQLITE_PRAGMAS = {"foreign_keys": "ON"}
+
+
+def apply_engine_options(app):
+    """
+    Fill in engine options for the configured database(s), by dialect; call before db.init_app().
+
+    Pooled server databases get DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE and
+    DB_POOL_PRE_PING. SQLite gets a lock timeout (SQLITE_BUSY_TIMEOUT_MS) instead, as its
+    file databases aren't pooled. Options already set in SQLALCHEMY_ENGINE_OPTIONS win.
+    """
+    config = app.config
+    uri = config.get("SQLALCHEMY_DATABASE_URI")
+    if uri:
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+            **_engine_options(uri, config),
+            **config.get("SQLALCHEMY_ENGINE_OPTIONS", {}),
+        }
+
+    readonly_uri = config.get("SQLALCHEMY_READONLY_DATABASE_URI")
+    if readonly_uri:
+        binds = dict(config.get("SQLALCHEMY_BINDS") or {})
+        binds[READONLY_BIND] = {"url": readonly_uri, **_engine_options(readonly_uri, config)}
+        config["SQLALCHEMY_BINDS"] = binds
+
+
+def _engine_options(uri: str, config) -> dict:
+    if make_url(uri).get_backend_name() == "sqlite":
+        options = {}
+        if config.get("SQLITE_BUSY_TIMEOUT_MS"):
+            options["connect_args"] = {"timeout": config["SQLITE_BUSY_TIMEOUT_MS"] / 1000}
+        return options
+
+    options = {"pool_pre_ping": config.get("DB_POOL_PRE_PING", True)}
+    for option, setting in (
+            ("pool_size", "DB_POOL_SIZE"),
+            ("max_overflow", "DB_MAX_OVERFLOW"),
+            ("pool_recycle", "DB_POOL_RECYCLE")
+    ):
+        if config.get(setting) is not None:
+            options[option] = config[setting]
+    return options
+
+
+def configure_engines(app):
+    """Register dialect-specific connect hooks on the app's engines; call within an app context"""
+    pragmas = {**DEFAULT_SQLITE_PRAGMAS, **app.config.get("SQLITE_PRAGMAS", {})}
+    if app.config.get("SQLITE_BUSY_TIMEOUT_MS"):
+        pragmas.setdefault("busy_timeout", app.config["SQLITE_BUSY_TIMEOUT_MS"])
+
+    for engine in db.engines.values():
+        if engine.dialect.name == "sqlite":
+            sql_event.listen(engine, "connect", _sqlite_pragmas(pragmas))
+
+
+def _sqlite_pragmas(pragmas: dict):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+    return set_sqlite_pragmas
+
+
+@contextmanager
+def read_session():
+    """
+    Session for list and detail reads.
+
+    Uses the read-only engine if one is configured (objects are detached when the
+    block ends); otherwise this is just db.session.
+    """
+    engine = db.engines.get(READONLY_BIND)
+    if engine is None:
+        yield db.session
+        return
+    with Session(engine) as session:
+        yield session
+
+
+def commit_keeping(*instances):
+    """
+    Commit the session, without expiring the given instances.
+
+    Use this for objects that were just written (so their values are what was
+    committed), to read them again without a SELECT. Everything else in the
+    session is expired, as with a plain commit; the app context pushed by
+    create_app means a session can outlive a request.
+    """
+    session = db.session()
+    expire_on_commit = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        session.commit()
+    finally:
+        session.expire_on_commit = expire_on_commit
 
-# Instruct SQLAlchemy to enforce FK constraints:
-@sql_event.listens_for(Engine, "connect")
-def set_sqlite_pragma(dbapi_connection, connection_record):
-    cursor = dbapi_connection.cursor()
-    cursor.execute("PRAGMA foreign_keys=ON")
-    cursor.close()
\ No newline at end of file
+    kept = {id(instance) for instance in instances}
+    for instance in list(session.identity_map.values()):
+        if id(instance) not in kept:
+            session.expire(instance)
@@ -1,90 +1,270 @@
-from webapp.models.base import db
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import NamedTuple
+
+from sqlalchemy.orm import aliased, joinedload, make_transient, make_transient_to_detached
+
+from webapp.models.base import db, read_session
+from webapp import board
 from webapp.event import Event
-from webapp.helpers import GameStatus, WinningPlayerNum, GamePosition
-from webapp.models.game_move import GameMove
+from webapp.helpers import GameStatus, WinningPlayerNum, GamePosition, encode_cursor, decode_cursor
+from webapp.models.game_move import GameMove, MoveRecord
 from webapp.models.player import Player
+from webapp.models.player_stat import PlayerStat
+
+# Games per page of a listing (by default, and at most)
+GAMES_PAGE_SIZE = 30
+GAMES_MAX_PAGE_SIZE = 200
+# Games that may be created in one bulk request
+GAMES_MAX_BULK_CREATE = 5000
+
+
+class GameSummary(NamedTuple):
+    """Read-only projection of a Game for listings, with the players' names"""
+    id: int
+    status: GameStatus
+    player_one_id: int
+    player_two_id: int
+    player_one_name: str
+    player_two_name: str
+    winning_player_number: WinningPlayerNum | None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "player_one_id": self.player_one_id,
+            "player_two_id": self.player_two_id,
+            "player_one_name": self.player_one_name,
+            "player_two_name": self.player_two_name,
+            "status": self.status.name,
+            "winning_player_number": self.winning_player_number.name if self.winning_player_number else None,
+        }
+
+
+class GamePage(NamedTuple):
+    """One page of a listing; next_cursor is None on the last page"""
+    games: list[GameSummary]
+    next_cursor: str | None
+
 
 class Game(db.Model):
+    __table_args__ = (
+        # Listings filter on status or player, and page on id
+        db.Index('ix_game_status_id', 'status', 'id'),
+        db.Index('ix_game_player_one_id_id', 'player_one_id', 'id'),
+        db.Index('ix_game_player_two_id_id', 'player_two_id', 'id'),
+    )
+
     id = db.Column(db.Integer(), primary_key=True)
     player_one_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=False)
     player_two_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=False)
     status = db.Column(db.Enum(GameStatus), nullable=False)
     next_move_sequence = db.Column(db.Integer())
     next_move_player_number = db.Column(db.Integer())
-    next_move_player_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=True)
-    board_state = db.Column(db.String(9))
-    winning_player_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=True)
+    next_move_player_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=True, index=True)
+    board_state = db.Column(db.String(board.MAX_CELLS))
+    board_rows = db.Column(db.Integer(), nullable=False, default=3, server_default="3")
+    board_cols = db.Column(db.Integer(), nullable=False, default=3, server_default="3")
+    win_length = db.Column(db.Integer(), nullable=False, default=3, server_default="3")
+    winning_player_id = db.Column(db.Integer(), db.ForeignKey('player.id'), nullable=True, index=True)
     winning_player_number = db.Column(db.Enum(WinningPlayerNum), nullable=True)
-    moves = db.relationship(
+    # When the game finished (UTC); NULL while in progress, and for games finished before this was recorded
+    finished_at = db.Column(db.DateTime(), nullable=True, index=True)
+    # The cell number of each move, in sequence (one byte per move; boards have at most 255 cells).
+    # NULL for games that predate the log, whose history is only in their GameMove rows.
+    move_log = db.Column(db.LargeBinary(board.MAX_CELLS), nullable=True)
+    move_rows = db.relationship(
         'GameMove',
         backref='game',
         lazy='dynamic',  # Load if required
         foreign_keys='GameMove.game_id'
     )
 
+    # next_move_sequence doubles as the row version: an UPDATE only applies if the row is still
+    # at the sequence it was read at (otherwise StaleDataError), so concurrent moves can't both land
+    __mapper_args__ = {
+        "version_id_col": next_move_sequence,
+        "version_id_generator": False,
+    }
+
     e_added = Event()
     e_updated = Event()
 
-    winning_combinations = [
-        # Horizontal
-        [GamePosition.TOP_ROW_LEFT_COL, GamePosition.TOP_ROW_CENTER_COL, GamePosition.TOP_ROW_RIGHT_COL],
-        [GamePosition.MIDDLE_ROW_LEFT_COL, GamePosition.MIDDLE_ROW_CENTER_COL, GamePosition.MIDDLE_ROW_RIGHT_COL],
-        [GamePosition.BOTTOM_ROW_LEFT_COL, GamePosition.BOTTOM_ROW_CENTER_COL, GamePosition.BOTTOM_ROW_RIGHT_COL],
-        # Vertical
-        [GamePosition.TOP_ROW_LEFT_COL, GamePosition.MIDDLE_ROW_LEFT_COL, GamePosition.BOTTOM_ROW_LEFT_COL],
-        [GamePosition.TOP_ROW_CENTER_COL, GamePosition.MIDDLE_ROW_CENTER_COL, GamePosition.BOTTOM_ROW_CENTER_COL],
-        [GamePosition.TOP_ROW_RIGHT_COL, GamePosition.MIDDLE_ROW_RIGHT_COL, GamePosition.BOTTOM_ROW_RIGHT_COL],
-        # Diagonal
-        [GamePosition.TOP_ROW_LEFT_COL, GamePosition.MIDDLE_ROW_CENTER_COL, GamePosition.BOTTOM_ROW_RIGHT_COL],
-        [GamePosition.TOP_ROW_RIGHT_COL, GamePosition.MIDDLE_ROW_CENTER_COL, GamePosition.BOTTOM_ROW_LEFT_COL],
-    ]
+    @classmethod
+    def bulk_add(cls, games: list["Game"]):
+        """
+        Insert many new games together (rather than flushing them one by one).
+
+        Each game is given its ID, and becomes persistent in the session; later changes
+        to the games are flushed as usual. Where the database driver can return IDs from
+        a batched INSERT (e.g. psycopg2), this is a single round trip.
+
+        Args:
+            games: New (transient) games
+        """
+        if not games:
+            return
+        db.session.bulk_save_objects(games, return_defaults=True)
+
+        # Each game now has its ID, but its values aren't recorded as saved (and would be
+        # written again); reset them to persistent, as if just loaded
+        for game in games:
+            make_transient(game)
+            make_transient_to_detached(game)
+            db.session.add(game)
 
     @classmethod
     def get_games(cls):
         return cls.query.order_by(Game.id.desc()).all()
 
     @classmethod
-    def get_game_by_id(cls, game_id: int):
-        return cls.query.get(int(game_id))
+    def get_games_page(
+            cls,
+            cursor: str = None,
+            limit: int = GAMES_PAGE_SIZE,
+            status: str = None,
+            player_id: int = None
+    ) -> GamePage:
+        """
+        One page of games, newest first (keyset pagination on Game.id).
+
+        Args:
+            cursor: next_cursor of the previous page; omit for the first page
+            limit: Games per page (at most GAMES_MAX_PAGE_SIZE)
+            status: Optional GameStatus name to filter on (e.g. "IN_PROGRESS")
+            player_id: Optional player, to show only their games
+
+        Returns:
+            GamePage
+        """
+        limit = min(max(int(limit), 1), GAMES_MAX_PAGE_SIZE)
+        with read_session() as session:
+            rows = cls._games_page_query(session, cursor, status, player_id).limit(limit + 1).all()
+
+        # One extra row tells us whether there is a further page
+        games = [GameSummary(*row) for row in rows[:limit]]
+        next_cursor = encode_cursor(games[-1].id) if len(rows) > limit else None
+        return GamePage(games, next_cursor)
+
+    @classmethod
+    def _games_page_query(cls, session, cursor: str, status: str, player_id: int):
+        player_one = aliased(Player)
+        player_two = aliased(Player)
+        query = session.query(
+            cls.id, cls.status, cls.player_one_id, cls.player_two_id,
+            player_one.name, player_two.name, cls.winning_player_number
+        ).join(
+            player_one, cls.player_one_id == player_one.id
+        ).join(
+            player_two, cls.player_two_id == player_two.id
+        )
+
+        if cursor:
+            query = query.filter(cls.id < decode_cursor(cursor))
+        if status:
+            if status.upper() not in GameStatus.__members__:
+                raise ValueError(f"Invalid status; expected one of {', '.join(GameStatus.__members__)}")
+            query = query.filter(cls.status == GameStatus[status.upper()])
+        if player_id:
+            player_id = int(player_id)
+            query = query.filter(db.or_(cls.player_one_id == player_id, cls.player_two_id == player_id))
+        return query.order_by(cls.id.desc())
+
+    @classmethod
+    def get_game_by_id(cls, game_id: int, load_players: bool = False, read_only: bool = False, refresh: bool = False):
+        """
+        Args:
+            game_id: The game's ID
+            load_players: If True, both players are loaded in the same (joined) query
+            read_only: If True, the game is read via the read-only engine (if configured),
+                and is detached; use this only for display
+            refresh: If True, the game is always read from the database, overwriting any
+                copy (and, with load_players, copies of its players) already in the session
+        """
+        with read_session() if read_only else nullcontext(db.session) as session:
+            query = session.query(cls)
+            if load_players:
+                query = query.options(joinedload(Game.player_one), joinedload(Game.player_two))
+            if refresh:
+                query = query.populate_existing()
+            return query.get(int(game_id))
 
     @classmethod
-    def check_for_winner(cls, board_state_str) -> WinningPlayerNum | None:
-        b = list(board_state_str)
-        for cond in cls.winning_combinations:
-            # noinspection PyTypeChecker
-            line = "".join([b[gp.value - 1] for gp in cond])
-            if line == "111":
-                return WinningPlayerNum.PLAYER_ONE
-            if line == "222":
-                return WinningPlayerNum.PLAYER_TWO
-        if "0" not in b:
-            return WinningPlayerNum.TIE
+    def get_games_for_player(cls, player_id: int, page: int = 1, per_page: int = 20):
+        """
+        One page of a player's games (as either player), newest first.
+
+        Returns:
+            flask_sqlalchemy Pagination
+        """
+        player_id = int(player_id)
+        return cls.query.filter(
+            db.or_(cls.player_one_id == player_id, cls.player_two_id == player_id)
+        ).order_by(cls.id.desc()).paginate(page=page, per_page=per_page, max_per_page=100, error_out=False)
+
+    @classmethod
+    def check_for_winner(cls, board_state_str, spec: board.BoardSpec = board.STANDARD_BOARD) -> WinningPlayerNum | None:
+        result = board.winner(*board.from_board_state(board_state_str), spec)
+        if result:
+            return WinningPlayerNum(result)
         return None  # No winner
 
+    @property
+    def board_spec(self) -> board.BoardSpec:
+        return board.get_spec(self.board_rows or 3, self.board_cols or 3, self.win_length or 3)
+
+    @property
+    def moves(self) -> list[MoveRecord]:
+        """The game's moves, in sequence (read from the move log, without a query, where there is one)"""
+        if self.move_log is None:
+            return [
+                MoveRecord(move.move_sequence, move.player_number, move.player_id, move.position)
+                for move in self.move_rows.order_by(GameMove.move_sequence)
+            ]
+
+        # Player 1 always moves first, then the players alternate
+        player_ids = (self.player_one_id, self.player_two_id)
+        return [
+            MoveRecord(idx + 1, idx % 2 + 1, player_ids[idx % 2], position)
+            for idx, position in enumerate(self.move_log)
+        ]
+
+    @property
+    def last_move_position(self) -> int | None:
+        """Cell number of the most recent move, or None if no moves yet"""
+        if self.move_log is None:
+            last_move = self.move_rows.order_by(GameMove.move_sequence.desc()).first()
+            return last_move.position if last_move else None
+        return self.move_log[-1] if self.move_log else None
+
     @property
     def winning_pieces(self) -> set[int]:
-        b = list(self.board_state)
-        winning_pieces = set()
-        for cond in Game.winning_combinations:
-            # noinspection PyTypeChecker
-            line = "".join([b[gp.value - 1] for gp in cond])
-            if line == "111" or line == "222":
-                winning_pieces.update({gp.value for gp in cond})
-        return winning_pieces
-    
+        spec = self.board_spec
+        p1, p2 = board.from_board_state(self.board_state)
+        return set(board.mask_to_positions(board.winning_lines(p1, spec) | board.winning_lines(p2, spec)))
+
     @classmethod
-    def valid_next_positions(cls, board_state_str) -> list[GamePosition]:
-        return [GamePosition(idx + 1) for idx, value in enumerate(board_state_str) if value == "0"]
+    def valid_next_positions(cls, board_state_str, spec: board.BoardSpec = board.STANDARD_BOARD) -> list[int]:
+        """Available positions; GamePosition members on the standard board, cell numbers otherwise"""
+        empty_cells = board.empty_cells(*board.from_board_state(board_state_str), spec)
+        if spec.is_standard:
+            return [GamePosition(pos) for pos in board.mask_to_positions(empty_cells)]
+        return board.mask_to_positions(empty_cells)
 
-    def __init__(self, player_one_id: int, player_two_id: int):
+    def __init__(self, player_one_id: int, player_two_id: int, board_spec: board.BoardSpec = board.STANDARD_BOARD):
 
         self.player_one_id = player_one_id
         self.player_two_id = player_two_id
         self.status = GameStatus.IN_PROGRESS
-        self.board_state = "0" * 9
+        self.board_rows = board_spec.rows
+        self.board_cols = board_spec.cols
+        self.win_length = board_spec.win_length
+        self.board_state = "0" * board_spec.cell_count
         self.winning_player_id = None
         self.winning_player_number = None
+        self.finished_at = None
         self.next_move_sequence = 1
+        self.move_log = b""
 
         # This tells us which player number (1 or 2), will take the next move.
         # Later, we might change this logic to randomise or alternate who the first player is?
@@ -95,11 +275,14 @@ class Game(db.Model):
 
     def board_state_as_matrix(self):
         b = self.board_state
-        z = [b[0] + b[1] + b[2], b[3] + b[4] + b[5], b[6] + b[7] + b[8]]
-        return z
+        cols = self.board_spec.cols
+        return [b[idx:idx + cols] for idx in range(0, len(b), cols)]
 
     def get_valid_next_positions(self) -> list:
-        return Game.valid_next_positions(self.board_state)
+        return Game.valid_next_positions(self.board_state, self.board_spec)
+
+    def get_bitboard(self) -> board.Bitboard:
+        return board.Bitboard.from_board_state(self.board_state, self.next_move_player_number, self.board_spec)
 
     def get_next_move_player_type(self) -> str:
         player_type = None
@@ -127,29 +310,38 @@ class Game(db.Model):
                 "next_move_sequence": self.next_move_sequence,
                 "board_state": self.board_state,
                 "board_state_as_matrix": self.board_state_as_matrix(),
+                "board": self.board_spec.to_dict(),
                 "winning_player_id": self.winning_player_id,
                 "winning_player_number": self.winning_player_number.name if self.winning_player_number else None,
+                "finished_at": self.finished_at.isoformat() if self.finished_at else None,
                 "next_move_player_number": self.next_move_player_number
             })
         return game_as_dict
 
-    def append_move(self, player_number: int, position: GamePosition):
-        updated_board_state = list(self.board_state)
-
-        # noinspection PyTypeChecker
-        updated_board_state[position.value - 1] = str(player_number)
+    def append_move(self, player_number: int, position: int):
+        spec = self.board_spec
+        p1, p2 = board.from_board_state(self.board_state)
+        bit = spec.cell_bits[int(position) - 1]
+        if player_number == 1:
+            p1 |= bit
+        else:
+            p2 |= bit
 
-        updated_board_state = "".join(updated_board_state)
-        self.board_state = updated_board_state
+        self.board_state = board.to_board_state(p1, p2, spec)
+        if self.move_log is not None:
+            self.move_log += bytes((int(position),))
         self.next_move_sequence += 1
-        
+
         # If this move was player 1, next move is player 2
         # If this move was player 2, next move is player 1
         self.next_move_player_number = 3 - player_number
 
-        winner_or_tie = Game.check_for_winner(self.board_state)
-        if winner_or_tie:
+        # Only the lines through this move need to be checked
+        result = board.winner_after_move(p1, p2, bit, spec)
+        if result:
+            winner_or_tie = WinningPlayerNum(result)
             self.status = GameStatus.FINISHED
+            self.finished_at = datetime.now(timezone.utc).replace(tzinfo=None)
             self.winning_player_number = winner_or_tie
             if winner_or_tie == WinningPlayerNum.PLAYER_ONE:
                 self.winning_player_id = self.player_one_id
@@ -157,6 +349,9 @@ class Game(db.Model):
                 self.winning_player_id = self.player_two_id
             self.next_move_player_number = None
             self.next_move_player_id = None
+
+            # Count the result in both players' stats, within this transaction
+            PlayerStat.record_game(self)
         else:
             # If this move was player 1, next move is now player 2
             # If this move was player 2, next move is now player 1
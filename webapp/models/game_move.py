@@ -1,16 +1,59 @@
+from typing import NamedTuple
+
 from webapp.models.base import db
 from webapp.event import Event
 from webapp.helpers import GamePosition
 
+
+class PositionType(db.TypeDecorator):
+    """
+    Stores a board position (1-based cell number).
+
+    Cells of the standard 3x3 board are stored by GamePosition name, as they always
+    have been; cells beyond these (on larger boards) are stored as their number.
+    """
+    impl = db.String(32)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        value = int(value)
+        if value in GamePosition._value2member_map_:
+            return GamePosition(value).name
+        return str(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if value in GamePosition.__members__:
+            return GamePosition[value].value
+        return int(value)
+
+
+class MoveRecord(NamedTuple):
+    """Read-only projection of a move, as read from a game's packed move log"""
+    move_sequence: int
+    player_number: int
+    player_id: int
+    position: int
+
+
 class GameMove(db.Model):
+    __table_args__ = (
+        # A game's moves are read in sequence; each sequence number is used once per game
+        db.Index('ix_game_move_game_id_move_sequence', 'game_id', 'move_sequence', unique=True),
+    )
+
     game: "Game"
     id = db.Column(db.Integer(), primary_key=True)
     game_id = db.Column(db.Integer(), db.ForeignKey('game.id'), nullable=False)
     move_sequence = db.Column(db.Integer())
     player_number = db.Column(db.Integer())
     player_id = db.Column(db.Integer())
-    position = db.Column(db.Enum(GamePosition))
+    position = db.Column(PositionType())
     e_added = Event()
+    e_bulk_added = Event()
 
     def __init__(
             self,
@@ -18,18 +61,34 @@ class GameMove(db.Model):
             move_sequence: int,
             player_number: int,
             player_id: int,
-            position: GamePosition
+            position: int
     ):
         self.game_id = game_id
         self.move_sequence = move_sequence
         self.player_number = player_number
         self.player_id = player_id
-        self.position = position
+        self.position = int(position)
 
         db.session.add(self)
 
         # Inform any event listeners:
         self.e_added.post_event(self)
 
+    @classmethod
+    def bulk_add(cls, moves: list[dict]):
+        """
+        Add many moves in a single INSERT (no GameMove objects are created).
+
+        Args:
+            moves: Column values for each move (game_id, move_sequence, player_number,
+                player_id, position)
+        """
+        if not moves:
+            return
+        db.session.bulk_insert_mappings(cls, moves)
+
+        # Inform any event listeners:
+        cls.e_bulk_added.post_event(moves)
+
     def __repr__(self):
-        return "{ id:{}, }".format(self.id)
\ No newline at end of file
+        return "{ id:{}, }".format(self.id)
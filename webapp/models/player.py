@@ -1,7 +1,28 @@
-from webapp.models.base import db
+from typing import NamedTuple
+
+from webapp.models.base import db, read_session
 from webapp.event import Event
 from webapp.helpers import GameStatus, WinningPlayerNum, GamePosition
 
+class PlayerSummary(NamedTuple):
+    """Read-only projection of a Player (without any of their games)"""
+    id: int
+    name: str
+    player_type: str
+    bot_difficulty: str | None
+
+    def to_dict(self) -> dict:
+        player_as_dict = {
+            "id": self.id,
+            "name": self.name,
+            "player_type": self.player_type,
+        }
+        if(self.player_type == "computer"):
+            player_as_dict['bot_difficulty'] = self.bot_difficulty
+
+        return player_as_dict
+
+
 class Player(db.Model):
     id = db.Column(db.Integer(), primary_key=True)
     name = db.Column(db.String(255))
@@ -10,13 +31,13 @@ class Player(db.Model):
     games_as_player_one = db.relationship(
         'Game',
         backref='player_one',
-        lazy='subquery',  # Always load
+        lazy='dynamic',  # Load if required
         foreign_keys='Game.player_one_id'
     )
     games_as_player_two = db.relationship(
         'Game',
         backref='player_two',
-        lazy='subquery',  # Always load
+        lazy='dynamic',  # Load if required
         foreign_keys='Game.player_two_id'
     )
     games_as_winner = db.relationship(
@@ -34,6 +55,7 @@ class Player(db.Model):
 
     e_added = Event()
     e_updated = Event()
+    e_bulk_upserted = Event()
 
     def __init__(self, name, player_type, bot_difficulty):
         self.name = name
@@ -65,11 +87,87 @@ class Player(db.Model):
     def get_players(cls):
         return cls.query.all()
 
+    @classmethod
+    def get_player_summaries(cls) -> list[PlayerSummary]:
+        """All players, as PlayerSummary tuples (selecting only those columns)"""
+        with read_session() as session:
+            rows = session.query(cls.id, cls.name, cls.player_type, cls.bot_difficulty).order_by(cls.id)
+            return [PlayerSummary(*row) for row in rows]
+
+    @classmethod
+    def has_players(cls) -> bool:
+        return db.session.query(cls.query.exists()).scalar()
+
     @classmethod
     def get_player_by_id(cls, player_id: int):
         this_player = cls.query.get(int(player_id))
         return this_player
 
+    @classmethod
+    def get_players_by_ids(cls, player_ids) -> dict[int, "Player"]:
+        """The given players, in one query, keyed by ID (IDs that don't exist are left out)"""
+        player_ids = {int(player_id) for player_id in player_ids}
+        if not player_ids:
+            return {}
+        return {player.id: player for player in cls.query.filter(cls.id.in_(player_ids))}
+
+    @classmethod
+    def bulk_upsert(cls, rows: list[dict]) -> tuple[int, int]:
+        """
+        Insert or update many players with bulk statements, then commit.
+
+        Each row is matched to an existing player by id (where given), otherwise by name;
+        unmatched rows are inserted (keeping any given id). Listeners of e_bulk_upserted
+        are informed once, with all of the rows.
+
+        Args:
+            rows: name, player_type and bot_difficulty of each player, with an optional id
+
+        Returns:
+            (inserted, updated) player counts
+        """
+        if not rows:
+            return 0, 0
+
+        ids = {row["id"] for row in rows if row.get("id") is not None}
+        names = {row["name"] for row in rows}
+        existing = db.session.query(cls.id, cls.name).filter(db.or_(cls.id.in_(ids), cls.name.in_(names)))
+        existing_ids = set()
+        id_by_name = {}
+        for player_id, name in sorted(existing):
+            existing_ids.add(player_id)
+            id_by_name.setdefault(name, player_id)
+
+        # Keyed, so that a later row for the same player wins
+        updates = {}
+        inserts = {}
+        for row in rows:
+            player_id = row.get("id")
+            if player_id is None:
+                player_id = id_by_name.get(row["name"])
+            if player_id in existing_ids:
+                updates[player_id] = {**row, "id": player_id}
+            else:
+                inserts[player_id if player_id is not None else row["name"]] = row
+
+        db.session.bulk_update_mappings(cls, list(updates.values()))
+        db.session.bulk_insert_mappings(cls, list(inserts.values()))
+        if any(row.get("id") is not None for row in inserts.values()):
+            cls._sync_id_sequence()
+        db.session.commit()
+
+        # Inform any event listeners:
+        cls.e_bulk_upserted.post_event(list(updates.values()) + list(inserts.values()))
+        return len(inserts), len(updates)
+
+    @classmethod
+    def _sync_id_sequence(cls):
+        """After inserting explicit ids, move PostgreSQL's id sequence past them (other databases need nothing)"""
+        if db.session.get_bind().dialect.name == "postgresql":
+            db.session.execute(db.text(
+                "SELECT setval(pg_get_serial_sequence('player', 'id'), (SELECT MAX(id) FROM player))"
+            ))
+
     @classmethod
     def update_player_by_id(cls, player_id: int, params):
         updated_player = None
@@ -0,0 +1,261 @@
+from contextlib import contextmanager
+from typing import NamedTuple
+
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import aliased
+
+from webapp.models.base import db, read_session
+from webapp.helpers import GameStatus, WinningPlayerNum
+
+# Players shown on a leaderboard (by default, and at most)
+LEADERBOARD_SIZE = 10
+LEADERBOARD_MAX_SIZE = 100
+
+# opponent_difficulty of games against a human player
+HUMAN_OPPONENT = "human"
+
+_COUNTS = ("played", "won", "lost", "tied")
+_KEY = ("player_id", "player_number", "opponent_difficulty")
+
+# Session.info key of the stats rows collected by PlayerStat.batched()
+_PENDING_ROWS = "pending_player_stats"
+
+# Stats rows upserted per statement
+UPSERT_BATCH_SIZE = 500
+
+
+def opponent_label(player) -> str:
+    """How an opponent is recorded in PlayerStat.opponent_difficulty"""
+    if player.player_type == "computer":
+        return player.bot_difficulty or "unknown"
+    return HUMAN_OPPONENT
+
+
+class LeaderboardEntry(NamedTuple):
+    """A player's totals, across sides and opponents"""
+    player_id: int
+    name: str
+    played: int
+    won: int
+    lost: int
+    tied: int
+
+    @property
+    def win_rate(self) -> float | None:
+        return self.won / self.played if self.played else None
+
+    def to_dict(self) -> dict:
+        return {
+            "player_id": self.player_id,
+            "name": self.name,
+            "played": self.played,
+            "won": self.won,
+            "lost": self.lost,
+            "tied": self.tied,
+            "win_rate": self.win_rate,
+        }
+
+
+class PlayerStat(db.Model):
+    """
+    Results of a player's finished games, by side (player number) and opponent difficulty.
+
+    Rows are incremented as each game finishes (see Game.append_move), so reports
+    read this small table rather than aggregating games.
+    """
+    __table_args__ = (
+        db.Index('ix_player_stat_won', 'won'),
+    )
+
+    player_id = db.Column(db.Integer(), db.ForeignKey('player.id'), primary_key=True)
+    player_number = db.Column(db.Integer(), primary_key=True)
+    opponent_difficulty = db.Column(db.String(255), primary_key=True)
+    played = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
+    won = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
+    lost = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
+    tied = db.Column(db.Integer(), nullable=False, default=0, server_default="0")
+
+    def to_dict(self) -> dict:
+        return {
+            "player_id": self.player_id,
+            "player_number": self.player_number,
+            "opponent_difficulty": self.opponent_difficulty,
+            "played": self.played,
+            "won": self.won,
+            "lost": self.lost,
+            "tied": self.tied,
+        }
+
+    @classmethod
+    def record_game(cls, game):
+        """
+        Count a finished game in both players' stats (as part of the current transaction).
+
+        Within PlayerStat.batched(), the counts are only collected, and written when the block ends.
+
+        Args:
+            game: The game, which has just finished
+        """
+        winner = game.winning_player_number
+        rows = []
+        for player_number, opponent in ((1, game.player_two), (2, game.player_one)):
+            won = winner is not None and winner.value == player_number
+            tied = winner == WinningPlayerNum.TIE
+            rows.append({
+                "player_id": game.player_one_id if player_number == 1 else game.player_two_id,
+                "player_number": player_number,
+                "opponent_difficulty": opponent_label(opponent),
+                "played": 1,
+                "won": int(won),
+                "lost": int(not won and not tied),
+                "tied": int(tied),
+            })
+
+        pending = db.session.info.get(_PENDING_ROWS)
+        if pending is not None:
+            pending.extend(rows)
+        else:
+            cls._increment(rows)
+
+    @classmethod
+    @contextmanager
+    def batched(cls):
+        """
+        Collect the stats of games finished within the block, and write them together when it ends
+        (e.g. for games created in bulk, which would otherwise each run their own upsert).
+        """
+        if _PENDING_ROWS in db.session.info:
+            yield  # Already collecting, for an enclosing block
+            return
+
+        pending = db.session.info[_PENDING_ROWS] = []
+        try:
+            yield
+        finally:
+            del db.session.info[_PENDING_ROWS]
+        if pending:
+            cls._increment(cls._combine(pending))
+
+    @staticmethod
+    def _combine(rows: list[dict]) -> list[dict]:
+        """Sum the counts of rows for the same stats row (an upsert may only change each row once)"""
+        combined = {}
+        for row in rows:
+            key = tuple(row[column] for column in _KEY)
+            if key in combined:
+                for count in _COUNTS:
+                    combined[key][count] += row[count]
+            else:
+                combined[key] = dict(row)
+        return list(combined.values())
+
+    @classmethod
+    def _increment(cls, rows: list[dict]):
+        """Add the counts of each row to its stats (inserting any row that doesn't exist yet)"""
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+                statement = insert(cls).values(rows[start:start + UPSERT_BATCH_SIZE])
+                db.session.execute(statement.on_conflict_do_update(
+                    index_elements=list(_KEY),
+                    set_={count: getattr(cls, count) + getattr(statement.excluded, count) for count in _COUNTS}
+                ))
+            return
+
+        for row in rows:
+            updated = db.session.execute(
+                db.update(cls).where(
+                    cls.player_id == row["player_id"],
+                    cls.player_number == row["player_number"],
+                    cls.opponent_difficulty == row["opponent_difficulty"],
+                ).values({count: getattr(cls, count) + row[count] for count in _COUNTS})
+            )
+            if not updated.rowcount:
+                db.session.execute(db.insert(cls).values(row))
+
+    @classmethod
+    def get_leaderboard(cls, limit: int = LEADERBOARD_SIZE) -> list[LeaderboardEntry]:
+        """
+        The top players by games won (then by fewest games played), from this table alone.
+
+        Args:
+            limit: Players to include (at most LEADERBOARD_MAX_SIZE)
+
+        Returns:
+            list[LeaderboardEntry]
+        """
+        from webapp.models.player import Player
+
+        limit = min(max(int(limit), 1), LEADERBOARD_MAX_SIZE)
+        totals = select(
+            cls.player_id,
+            func.sum(cls.played).label("played"),
+            func.sum(cls.won).label("won"),
+            func.sum(cls.lost).label("lost"),
+            func.sum(cls.tied).label("tied"),
+        ).group_by(cls.player_id).order_by(
+            func.sum(cls.won).desc(), func.sum(cls.played), cls.player_id
+        ).limit(limit).subquery()
+
+        with read_session() as session:
+            rows = session.query(
+                totals.c.player_id, Player.name, totals.c.played, totals.c.won, totals.c.lost, totals.c.tied
+            ).join(Player, Player.id == totals.c.player_id).order_by(
+                totals.c.won.desc(), totals.c.played, totals.c.player_id
+            )
+            return [LeaderboardEntry(*row) for row in rows]
+
+    @classmethod
+    def get_player_stats(cls, player_id: int) -> list["PlayerStat"]:
+        """A player's stats, by side and opponent difficulty"""
+        return cls.query.filter(cls.player_id == int(player_id)).order_by(
+            cls.player_number, cls.opponent_difficulty
+        ).all()
+
+    @classmethod
+    def rebuild(cls) -> int:
+        """
+        Recompute every player's stats from their finished games (in bulk, with INSERT ... SELECT).
+
+        Returns:
+            The number of stats rows written
+        """
+        db.session.execute(db.delete(cls))
+        columns = ["player_id", "player_number", "opponent_difficulty", *_COUNTS]
+        for player_number in (1, 2):
+            db.session.execute(db.insert(cls).from_select(columns, cls._results_by_side(player_number)))
+        db.session.commit()
+        return db.session.query(func.count()).select_from(cls).scalar()
+
+    @staticmethod
+    def _results_by_side(player_number: int):
+        """Stats of every player's finished games as player_number, aggregated by the database"""
+        from webapp.models.game import Game
+        from webapp.models.player import Player
+
+        opponent = aliased(Player)
+        player_id = Game.player_one_id if player_number == 1 else Game.player_two_id
+        opponent_id = Game.player_two_id if player_number == 1 else Game.player_one_id
+        won = WinningPlayerNum(player_number)
+        lost = WinningPlayerNum(3 - player_number)
+
+        def count_of(result):
+            return func.sum(case((Game.winning_player_number == result, 1), else_=0))
+
+        opponent_difficulty = case(
+            (opponent.player_type == "computer", func.coalesce(opponent.bot_difficulty, "unknown")),
+            else_=HUMAN_OPPONENT
+        )
+        return select(
+            player_id,
+            literal(player_number),
+            opponent_difficulty,
+            func.count(),
+            count_of(won),
+            count_of(lost),
+            count_of(WinningPlayerNum.TIE),
+        ).join(opponent, opponent.id == opponent_id).where(
+            Game.status == GameStatus.FINISHED
+        ).group_by(player_id, opponent_difficulty)
@@ -1,26 +1,71 @@
 """API routes for game management"""
 
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 
-from webapp.services import GameService
-from webapp.models.game import Game
+from webapp import board
+from webapp.services import GameService, MoveConflictError
+from webapp.services.bot_executor import bot_executor
+from webapp.services.game_cache import game_cache
+from webapp.services.game_export import EXPORT_FORMATS, ExportFilter, export_games
+from webapp.models.game import Game, GAMES_PAGE_SIZE, GAMES_MAX_BULK_CREATE
+from webapp.models.player import Player
 
 api_games_bp = Blueprint('api_games', __name__)
 
 
 @api_games_bp.route("/games/", methods=["GET"])
 def get_all():
-    """Get all games"""
+    """
+    Get one page of games (newest first).
+
+    Query parameters (all optional):
+        cursor: next_cursor from the previous page
+        limit: Games per page
+        status: IN_PROGRESS or FINISHED
+        player_id: Only this player's games
+    """
     response = {'status': None, 'data': []}
-    games = Game.get_games()
-    
-    if games:
-        response['data'] = [game.to_dict(full_detail=False) for game in games]
-    
-    response['status'] = 200  # OK
+    try:
+        page = Game.get_games_page(
+            cursor=request.args.get('cursor'),
+            limit=request.args.get('limit', GAMES_PAGE_SIZE, type=int),
+            status=request.args.get('status'),
+            player_id=request.args.get('player_id', type=int)
+        )
+        response['data'] = [game.to_dict() for game in page.games]
+        response['next_cursor'] = page.next_cursor
+        response['status'] = 200  # OK
+    except (ValueError, TypeError) as err:
+        response['message'] = err.args[0]
+        response['status'] = 400  # Bad request
+
     return response
 
 
+@api_games_bp.route("/games/export", methods=["GET"])
+def export():
+    """
+    Stream every game, with its moves, oldest first.
+
+    Query parameters (all optional):
+        format: ndjson (default) or csv
+        finished_after: Only games finished after this (ISO 8601, UTC) timestamp
+        min_id, max_id: Only games in this (inclusive) id range
+    """
+    export_format = request.args.get('format', 'ndjson')
+    try:
+        export_filter = ExportFilter.from_params(request.args)
+        lines = export_games(export_format, export_filter)
+    except ValueError as err:
+        return {'status': 400, 'data': [], 'message': err.args[0]}  # Bad request
+
+    return Response(
+        stream_with_context(lines),
+        mimetype=EXPORT_FORMATS[export_format],
+        headers={'Content-Disposition': f'attachment; filename=games.{export_format}'}
+    )
+
+
 @api_games_bp.route("/games/new", methods=["POST"])
 def add():
     """
@@ -29,7 +74,10 @@ def add():
     Expected JSON payload:
     {
         "player_one_id": 1,
-        "player_two_id": 2
+        "player_two_id": 2,
+        "board_rows": 3,  (optional)
+        "board_cols": 3,  (optional)
+        "win_length": 3   (optional)
     }
     """
     response = {'status': None, 'data': []}
@@ -45,9 +93,10 @@ def add():
                     player_one_id=int(player_one_id),
                     player_two_id=int(player_two_id)
                 )
-                game = game_service.create_game()
+                game = game_service.create_game(board.spec_from_params(request.json))
                 response['data'] = game.to_dict()
-            except ValueError as err:
+                response['data']['bot_move_pending'] = game_service.bot_move_pending
+            except (ValueError, TypeError) as err:
                 response['message'] = err.args[0]
     
     if response['data']:
@@ -58,21 +107,176 @@ def add():
     return response
 
 
+@api_games_bp.route("/games/bulk", methods=["POST"])
+def bulk_add():
+    """
+    Create many games in one request (e.g. for tournaments or load tests).
+
+    Expected JSON payload:
+    {
+        "games": [
+            {"player_one_id": 1, "player_two_id": 2},
+            [3, 4],  (a [player one id, player two id] pair also works)
+            ...
+        ],
+        "board_rows": 3,  (optional, for every game)
+        "board_cols": 3,  (optional)
+        "win_length": 3   (optional)
+    }
+    """
+    response = {'status': None, 'data': []}
+    content_type = request.headers.get('Content-Type')
+
+    if content_type == 'application/json' and not isinstance(request.json, dict):
+        response['message'] = "Expected a JSON object, with a list of games"
+    elif content_type == 'application/json':
+        try:
+            games = request.json.get('games') or []
+            if not isinstance(games, list):
+                raise ValueError("Expected games to be a list")
+            player_pairs = [
+                (game.get('player_one_id'), game.get('player_two_id')) if isinstance(game, dict) else game
+                for game in games
+            ]
+            created = GameService.create_games(player_pairs, board.spec_from_params(request.json))
+            response['data'] = {'count': len(created), 'game_ids': [game.id for game in created]}
+        except (ValueError, TypeError) as err:
+            response['message'] = err.args[0]
+
+    if response['data']:
+        response['status'] = 201  # Created
+    else:
+        response['status'] = 400  # Bad request
+
+    return response
+
+
 @api_games_bp.route("/games/<game_id>/", methods=["GET"])
 def get_by_id(game_id: int):
     """Get a specific game by ID"""
     response = {'status': None, 'data': []}
-    game = Game.get_game_by_id(game_id)
+    game = Game.get_game_by_id(game_id, read_only=True)
     
     if game:
         response['status'] = 200
         response['data'] = game.to_dict()
+        response['data']['bot_move_pending'] = bot_executor.is_pending(game.id)
     else:
         response['status'] = 400  # Bad request
     
     return response
 
 
+@api_games_bp.route("/games/import", methods=["POST"])
+def import_games():
+    """
+    Import recorded games, replaying each game's moves (one transaction per game).
+
+    Expected JSON payload:
+    {
+        "games": [
+            {
+                "player_one_id": 1,
+                "player_two_id": 2,
+                "moves": [5, 1, {"player_id": 1, "position": 9}, ...],
+                "board_rows": 3,  (optional)
+                "board_cols": 3,  (optional)
+                "win_length": 3   (optional)
+            },
+            ...
+        ]
+    }
+
+    Each game is imported or rejected on its own; "data" has a result per game.
+    """
+    response = {'status': None, 'data': []}
+    content_type = request.headers.get('Content-Type')
+
+    if content_type == 'application/json' and not isinstance(request.json, dict):
+        response['message'] = "Expected a JSON object, with a list of games"
+    elif content_type == 'application/json':
+        records = request.json.get('games') or []
+        if not isinstance(records, list):
+            response['message'] = "Expected games to be a list"
+            records = []
+        elif len(records) > GAMES_MAX_BULK_CREATE:
+            response['message'] = f"Too many games; at most {GAMES_MAX_BULK_CREATE} may be imported at once"
+            records = []
+
+        # Load every player up front (one query); each GameService then finds them in the session.
+        # Invalid IDs are reported per game, below.
+        Player.get_players_by_ids(
+            record[key] for record in records if isinstance(record, dict)
+            for key in ('player_one_id', 'player_two_id') if str(record.get(key)).isdigit()
+        )
+
+        for record in records:
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("Expected each game to be an object")
+                try:
+                    player_one_id = int(record.get('player_one_id'))
+                    player_two_id = int(record.get('player_two_id'))
+                except (TypeError, ValueError):
+                    raise ValueError("Each game needs a player one ID and a player two ID")
+                game_service = GameService(player_one_id=player_one_id, player_two_id=player_two_id)
+                game = game_service.import_game(record.get('moves'), board.spec_from_params(record))
+                response['data'].append({'game_id': game.id, 'status': game.status.name})
+            except (ValueError, TypeError) as err:
+                response['data'].append({'game_id': None, 'message': err.args[0]})
+
+    failed = sum(1 for result in response['data'] if result['game_id'] is None)
+    if response['data'] and not failed:
+        response['status'] = 201  # Created
+    else:
+        if failed:
+            response['message'] = f"{failed} of {len(response['data'])} games could not be imported"
+        response['status'] = 400  # Bad request
+
+    return response
+
+
+@api_games_bp.route("/games/<game_id>/moves", methods=["PUT"])
+def moves_add_many(game_id: int):
+    """
+    Add an ordered list of moves to a game (validated together, and saved in one transaction).
+
+    Expected JSON payload:
+    {
+        "move_sequence": 1,  (of the first move)
+        "moves": [5, {"player_id": 2, "position": 1}, ...]
+    }
+    """
+    response = {'status': None, 'data': []}
+    content_type = request.headers.get('Content-Type')
+
+    if content_type == 'application/json' and not isinstance(request.json, dict):
+        response['message'] = "Expected a JSON object, with a move_sequence and a list of moves"
+    elif content_type == 'application/json':
+        move_sequence = request.json.get('move_sequence')
+        moves = request.json.get('moves')
+
+        if all([game_id, move_sequence, moves]):
+            try:
+                game_service = GameService(game_id=game_id)
+                game_service.append_game_moves(move_sequence=move_sequence, moves=moves)
+                response['data'] = game_service.game.to_dict()
+                response['data']['bot_move_pending'] = game_service.bot_move_pending
+            except MoveConflictError as err:
+                response['message'] = err.args[0]
+                response['status'] = 409  # Conflict
+                return response
+            except (ValueError, TypeError) as err:
+                response['message'] = err.args[0]
+
+    if response['data']:
+        response['status'] = 200  # OK
+    else:
+        response['status'] = 400  # Bad request
+
+    return response
+
+
 @api_games_bp.route("/games/<game_id>/<move_sequence>", methods=["PUT"])
 def moves_add(game_id: int, move_sequence: int):
     """
@@ -101,6 +305,11 @@ def moves_add(game_id: int, move_sequence: int):
                     position=position
                 )
                 response['data'] = game_service.game.to_dict()
+                response['data']['bot_move_pending'] = game_service.bot_move_pending
+            except MoveConflictError as err:
+                response['message'] = err.args[0]
+                response['status'] = 409  # Conflict
+                return response
             except (ValueError, TypeError) as err:
                 response['message'] = err.args[0]
     
@@ -109,4 +318,16 @@ def moves_add(game_id: int, move_sequence: int):
     else:
         response['status'] = 400  # Bad request
     
-    return response
\ No newline at end of file
+    return response
+
+
+@api_games_bp.route("/bots/executor", methods=["GET"])
+def bot_executor_stats():
+    """Queue depth and latency of background bot turns"""
+    return {'status': 200, 'data': bot_executor.stats()}
+
+
+@api_games_bp.route("/games/cache", methods=["GET"])
+def game_cache_stats():
+    """Hit rate and size of the in-progress game cache"""
+    return {'status': 200, 'data': game_cache.stats()}
@@ -34,6 +34,29 @@ def index():
             method='POST',
             template='api_players_add.html'
         ),
+        ApiEndpoint(
+            model='player',
+            title='Get Games by Player id',
+            handle='api_players.games_get_by_player_id',
+            method='GET',
+            template='api_players_games_get_by_player_id.html',
+            default_params={'player_id': '.PLAYER_ID.'}
+        ),
+        ApiEndpoint(
+            model='player',
+            title='Get Stats by Player id',
+            handle='api_players.stats_get_by_player_id',
+            method='GET',
+            template='api_players_get_by_id.html',
+            default_params={'player_id': '.PLAYER_ID.'}
+        ),
+        ApiEndpoint(
+            model='player',
+            title='Get Leaderboard',
+            handle='api_players.leaderboard',
+            method='GET',
+            template='api_players_get_all.html'
+        ),
         ApiEndpoint(
             model='player',
             title='Update Player',
@@ -57,6 +80,13 @@ def index():
             method='POST',
             template='api_games_add.html'
         ),
+        ApiEndpoint(
+            model='game',
+            title='Add Games (bulk)',
+            handle='api_games.bulk_add',
+            method='POST',
+            template='api_games_bulk_add.html'
+        ),
         ApiEndpoint(
             model='game',
             title='Get Game by id',
@@ -73,6 +103,21 @@ def index():
             template='api_games_moves_add.html',
             default_params={'game_id': '.GAME_ID.', 'move_sequence': '.MOVE_SEQUENCE.'}
         ),
+        ApiEndpoint(
+            model='game move',
+            title='Add Game Moves (batch)',
+            handle='api_games.moves_add_many',
+            method='PUT',
+            template='api_games_moves_add_many.html',
+            default_params={'game_id': '.GAME_ID.'}
+        ),
+        ApiEndpoint(
+            model='game',
+            title='Import Games (replay recorded moves)',
+            handle='api_games.import_games',
+            method='POST',
+            template='api_games_import.html'
+        ),
     ]
     
     return render_template("api_index.html", api_endpoint_list=api_endpoint_list)
\ No newline at end of file
@@ -3,6 +3,8 @@
 from flask import Blueprint, request
 
 from webapp.models.player import Player
+from webapp.models.game import Game
+from webapp.models.player_stat import PlayerStat, LEADERBOARD_SIZE
 
 api_players_bp = Blueprint('api_players', __name__)
 
@@ -44,7 +46,7 @@ def add():
 def get_all():
     """Get all players"""
     response_data = []
-    players = Player.get_players()
+    players = Player.get_player_summaries()
     
     if players:
         response_data = [player.to_dict() for player in players]
@@ -68,6 +70,69 @@ def get_by_id(player_id: int):
 
 
 
+@api_players_bp.route("/players/<player_id>/games", methods=["GET"])
+def games_get_by_player_id(player_id: int):
+    """
+    Get one page of a player's games (newest first).
+
+    Query parameters: page (default 1), per_page (default 20, at most 100)
+    """
+    response = {'status': None, 'data': []}
+    try:
+        page = request.args.get('page', 1, type=int)
+        per_page = request.args.get('per_page', 20, type=int)
+        if Player.get_player_by_id(player_id):
+            games = Game.get_games_for_player(player_id, page, per_page)
+            response['data'] = [game.to_dict(full_detail=False) for game in games.items]
+            response['page'] = games.page
+            response['per_page'] = games.per_page
+            response['total'] = games.total
+            response['status'] = 200
+    except (ValueError, TypeError) as err:
+        response['message'] = err.args[0]
+
+    if not response['status']:
+        response['status'] = 400  # Bad request
+
+    return response
+
+
+@api_players_bp.route("/players/<player_id>/stats", methods=["GET"])
+def stats_get_by_player_id(player_id: int):
+    """Get a player's results, by side (player number) and opponent difficulty"""
+    response = {'status': None, 'data': []}
+    try:
+        if Player.get_player_by_id(player_id):
+            response['data'] = [stat.to_dict() for stat in PlayerStat.get_player_stats(player_id)]
+            response['status'] = 200
+    except (ValueError, TypeError) as err:
+        response['message'] = err.args[0]
+
+    if not response['status']:
+        response['status'] = 400  # Bad request
+
+    return response
+
+
+@api_players_bp.route("/players/leaderboard", methods=["GET"])
+def leaderboard():
+    """
+    Get the top players, by games won.
+
+    Query parameters: limit (default 10, at most 100)
+    """
+    response = {'status': None, 'data': []}
+    try:
+        entries = PlayerStat.get_leaderboard(request.args.get('limit', LEADERBOARD_SIZE, type=int))
+        response['data'] = [entry.to_dict() for entry in entries]
+        response['status'] = 200
+    except (ValueError, TypeError) as err:
+        response['message'] = err.args[0]
+        response['status'] = 400  # Bad request
+
+    return response
+
+
 @api_players_bp.route("/players/<player_id>/", methods=["PUT"])
 def update_by_id(player_id: int):
     """
@@ -2,10 +2,13 @@
 
 from flask import Blueprint, render_template, request, url_for, flash, Markup, redirect
 
-from webapp.services import GameService
+from webapp import board
+from webapp.services import GameService, MoveConflictError
+from webapp.services.bot_executor import bot_executor
 from webapp.helpers import GameStatus
 from webapp.models.player import Player
 from webapp.models.game import Game
+from webapp.models.player_stat import PlayerStat
 
 ui_bp = Blueprint('ui', __name__)
 
@@ -23,7 +26,7 @@ def about():
 @ui_bp.route('/game/new')
 def games_new():
     """New game page"""
-    return render_template("ui_games_new.html", player_list=Player.get_players())
+    return render_template("ui_games_new.html", player_list=Player.get_player_summaries())
 
 
 @ui_bp.route("/games/", methods=["POST"])
@@ -40,25 +43,45 @@ def games_add():
                 player_one_id=int(player_one_id),
                 player_two_id=int(player_two_id)
             )
-            game = game_service.create_game()
+            game = game_service.create_game(board.spec_from_params(request.values))
             flash(f"Game created successfully!", 'success')
             # Redirect immediately to the new game
             return redirect(url_for('ui.games_get_by_id', game_id=game.id))
-        except ValueError as err:
+        except (ValueError, TypeError) as err:
             error_message = err.args[0]
     
     if not game:
         if not error_message:
             error_message = "Unexpected Error"
         flash(f"{error_message}", 'error')
-        # Keep fallback to list of all games if creation failed
-        return render_template("ui_games_get_all.html", all_games=Game.get_games())
+        # Keep fallback to list of games if creation failed
+        return _render_games_page()
 
 
 @ui_bp.route("/games/", methods=["GET"])
 def games_get_all():
-    """List all games"""
-    return render_template("ui_games_get_all.html", all_games=Game.get_games())
+    """List games, a page at a time"""
+    try:
+        return _render_games_page(
+            cursor=request.args.get('cursor'),
+            status=request.args.get('status'),
+            player_id=request.args.get('player_id', type=int)
+        )
+    except (ValueError, TypeError) as err:
+        flash(f"{err.args[0]}", 'error')
+        return _render_games_page()
+
+
+def _render_games_page(cursor: str = None, status: str = None, player_id: int = None):
+    page = Game.get_games_page(cursor=cursor, status=status, player_id=player_id)
+    return render_template(
+        "ui_games_get_all.html",
+        all_games=page.games,
+        next_cursor=page.next_cursor,
+        status=status,
+        player_id=player_id,
+        enumGameStatus=GameStatus
+    )
 
 
 @ui_bp.route("/games/<int:game_id>/", methods=["GET"])
@@ -72,7 +95,7 @@ def games_get_by_id(game_id: int):
         response['data'] = game_service.game.to_dict()
         all_moves = []
         for move in game_service.game.moves:
-            all_moves.append(move.position.value)
+            all_moves.append(move.position)
 
         return render_template(
             "ui_games_get_by_id.html",
@@ -82,7 +105,8 @@ def games_get_by_id(game_id: int):
             board=list(game_service.game.board_state),
             enumGameStatus=GameStatus,
             last_move_position=game_service.get_last_move_position(),
-            all_moves=list(all_moves)
+            all_moves=list(all_moves),
+            bot_move_pending=bot_executor.is_pending(game_service.game.id)
         )
     else:
         response['status'] = 400  # Bad request
@@ -111,8 +135,11 @@ def games_moves_add(game_id: int):
                 player_two=game_service.player_two,
                 board=list(game_service.game.board_state),
                 enumGameStatus=GameStatus,
-                last_move_position=game_service.get_last_move_position()
+                last_move_position=game_service.get_last_move_position(),
+                bot_move_pending=game_service.bot_move_pending
             )
+        except MoveConflictError as err:
+            return err.args[0], 409
         except (ValueError, TypeError) as err:
             return err.args[0]
     
@@ -123,9 +150,9 @@ def games_moves_add(game_id: int):
 # def join_game():
 #     """Join game page (placeholder)"""
 #     return '<a href="/">Return to menu</a>'
-#
-#
-# @ui_bp.route('/stats')
-# def stats():
-#     """Statistics page (placeholder)"""
-#     return '<a href="/">Return to menu</a>'
+
+
+@ui_bp.route('/stats')
+def stats():
+    """Statistics page: the leaderboard"""
+    return render_template("ui_stats.html", leaderboard=PlayerStat.get_leaderboard())
@@ -2,8 +2,9 @@
 Services module for business logic and game orchestration
 """
 
-from webapp.services.game_service import GameService
+from webapp.services.game_service import GameService, MoveConflictError
 
 __all__ = [
     'GameService',
+    'MoveConflictError',
 ]
\ No newline at end of file
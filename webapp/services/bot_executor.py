@@ -0,0 +1,165 @@
+"""
+Background execution of bot turns.
+
+With BOT_MOVES_ASYNC enabled, a request that leaves a computer player to move
+returns as soon as the human's move is committed. The bot turns are then
+played, and committed, by a bounded pool of worker threads. Games are queued
+at most once; once BOT_MAX_PENDING games are queued, further bot turns are
+played in the request as before.
+
+With BOT_MOVE_PROCESSES set, the moves themselves are calculated in a
+process pool, so CPU-heavy bots don't hold the GIL against request threads.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Dict
+
+from webapp.bots import get_bot_strategy
+from webapp.models.base import db
+from webapp.simulated_game import SimulatedGame
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PENDING = 64
+
+
+def _calculate_move(difficulty: str, game: SimulatedGame) -> int:
+    """Calculate a bot's move (in a worker process)"""
+    return int(get_bot_strategy(difficulty).calculate_next_move(game))
+
+
+class BotExecutor:
+    """Bounded pool for bot turns, with queue and latency statistics"""
+
+    def __init__(self):
+        self._app = None
+        self._workers = DEFAULT_WORKERS
+        self._max_pending = DEFAULT_MAX_PENDING
+        self._move_processes = 0
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+        # game id -> time queued
+        self._pending: Dict[int, float] = {}
+        self._running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    def init_app(self, app):
+        """Read the executor's settings from the app config"""
+        self._app = app
+        self._workers = app.config.get("BOT_WORKERS", DEFAULT_WORKERS)
+        self._max_pending = app.config.get("BOT_MAX_PENDING", DEFAULT_MAX_PENDING)
+        self._move_processes = app.config.get("BOT_MOVE_PROCESSES", 0)
+
+    def is_pending(self, game_id: int) -> bool:
+        """True if the game's bot turns are queued or running"""
+        with self._lock:
+            return game_id in self._pending
+
+    def submit(self, game_id: int, task: Callable[[int], None]) -> bool:
+        """
+        Queue a game's bot turns.
+
+        Args:
+            game_id: The game
+            task: Called as task(game_id) on a worker thread, within an app context
+
+        Returns:
+            True if the game is queued (or already was); False if the queue is full
+        """
+        with self._lock:
+            if game_id in self._pending:
+                return True
+            if len(self._pending) >= self._max_pending:
+                self.rejected += 1
+                return False
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(max_workers=self._workers, thread_name_prefix="bot")
+            self._pending[game_id] = time.perf_counter()
+            self.submitted += 1
+        self._threads.submit(self._run, game_id, task)
+        return True
+
+    def calculate_move(self, difficulty: str, game) -> int:
+        """Calculate a bot's next move; in the process pool, if there is one"""
+        if not self._move_processes:
+            return get_bot_strategy(difficulty).calculate_next_move(game)
+
+        with self._lock:
+            if self._processes is None:
+                self._processes = ProcessPoolExecutor(max_workers=self._move_processes)
+        snapshot = SimulatedGame(game.id, game.board_spec)
+        bitboard = game.get_bitboard()
+        snapshot.masks = [0, bitboard.p1, bitboard.p2]
+        snapshot.next_move_sequence = game.next_move_sequence
+        snapshot.next_move_player_number = game.next_move_player_number
+        return self._processes.submit(_calculate_move, difficulty, snapshot).result()
+
+    def _run(self, game_id: int, task: Callable[[int], None]):
+        started = time.perf_counter()
+        with self._lock:
+            queued_at = self._pending[game_id]
+            self._running += 1
+
+        failed = False
+        try:
+            with self._app.app_context():
+                try:
+                    task(game_id)
+                except Exception:
+                    db.session.rollback()
+                    raise
+        except Exception:
+            failed = True
+            logger.exception("Bot turn failed for game %s", game_id)
+        finally:
+            finished = time.perf_counter()
+            with self._lock:
+                del self._pending[game_id]
+                self._running -= 1
+                self.completed += 1
+                if failed:
+                    self.failed += 1
+                self.total_wait += started - queued_at
+                self.total_latency += finished - queued_at
+                self.max_latency = max(self.max_latency, finished - queued_at)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self._workers,
+                "move_processes": self._move_processes,
+                "max_pending": self._max_pending,
+                "queue_depth": len(self._pending) - self._running,
+                "running": self._running,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "mean_wait": self.total_wait / self.completed if self.completed else None,
+                "mean_latency": self.total_latency / self.completed if self.completed else None,
+                "max_latency": self.max_latency,
+            }
+
+    def shutdown(self, wait: bool = True):
+        if self._threads:
+            self._threads.shutdown(wait=wait)
+            self._threads = None
+        if self._processes:
+            self._processes.shutdown(wait=wait)
+            self._processes = None
+
+
+# One executor per process
+bot_executor = BotExecutor()
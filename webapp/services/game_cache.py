@@ -0,0 +1,185 @@
+"""
+Process-local, write-through cache of in-progress games.
+
+After GameService commits a change, it stores a snapshot of the game's
+columns, both players' columns and the last move's position. The next request
+for that game rebuilds the objects from the snapshot and attaches them to the
+session as persistent, without a SELECT. Further changes are written to the
+database as usual; the cache is only ever a copy of committed state.
+
+Each process has its own cache, so with several processes an entry can be
+behind the database. Moves played against a stale entry fail the game's
+version check (see MoveConflictError), and GameService reloads the game from
+the database before rejecting a move that a cached copy considers invalid.
+
+Finished games are evicted. Entries are also dropped when a Game or Player
+posts an e_added/e_updated event (i.e. is changed outside GameService), or when
+their players are bulk upserted.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Tuple
+
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+
+from webapp.helpers import GameStatus
+from webapp.models.base import db
+from webapp.models.game import Game
+from webapp.models.player import Player
+
+DEFAULT_MAX_ENTRIES = 1000
+
+# Marks a last move position that isn't known yet
+UNKNOWN = object()
+
+
+class CachedGame(NamedTuple):
+    """Column values of a game and its players, as last committed"""
+    game: dict
+    player_one: dict
+    player_two: dict
+    last_move_position: object
+
+
+def _columns(instance) -> dict:
+    return {attr.key: getattr(instance, attr.key) for attr in instance.__mapper__.column_attrs}
+
+
+def _attach(cls, values: dict):
+    """An instance with the given (committed) column values, persistent in the current session"""
+    key = identity_key(cls, values["id"])
+    instance = db.session.identity_map.get(key)
+    if instance is not None:
+        # The session's copy may be expired, or older than the entry
+        for name, value in values.items():
+            set_committed_value(instance, name, value)
+        return instance
+
+    instance = cls.__mapper__.class_manager.new_instance()
+    for name, value in values.items():
+        setattr(instance, name, value)
+    make_transient_to_detached(instance)
+    db.session.add(instance)
+    return instance
+
+
+class GameCache:
+    """Bounded LRU of CachedGame entries, keyed by game id"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        Game.e_added.add_listener(self._on_game_changed)
+        Game.e_updated.add_listener(self._on_game_changed)
+        Player.e_added.add_listener(self._on_player_changed)
+        Player.e_updated.add_listener(self._on_player_changed)
+        Player.e_bulk_upserted.add_listener(self._on_players_upserted)
+
+    def init_app(self, app):
+        """Read the cache size from the app config (GAME_CACHE_MAX_ENTRIES; 0 disables the cache)"""
+        self.max_entries = app.config.get("GAME_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)
+        self.clear()
+
+    def load(self, game_id: int) -> Tuple[Game, Player, Player, object] | None:
+        """
+        Rebuild a cached game in the current session.
+
+        Returns:
+            (game, player one, player two, last move position), or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(game_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(game_id)
+            self.hits += 1
+
+        player_one = _attach(Player, entry.player_one)
+        player_two = _attach(Player, entry.player_two)
+        game = _attach(Game, entry.game)
+        return game, player_one, player_two, entry.last_move_position
+
+    def store(self, game: Game, player_one: Player, player_two: Player, last_move_position=UNKNOWN):
+        """
+        Record a game's committed state (finished games are evicted instead).
+
+        A state older than the one already cached (i.e. at an earlier move sequence,
+        written through late by another thread) is ignored.
+        """
+        if not self.max_entries or game.id is None:
+            return
+        if game.status != GameStatus.IN_PROGRESS:
+            self.invalidate(game.id)
+            return
+
+        entry = CachedGame(_columns(game), _columns(player_one), _columns(player_two), last_move_position)
+        with self._lock:
+            current = self._entries.get(game.id)
+            if current is not None and current.game["next_move_sequence"] > entry.game["next_move_sequence"]:
+                return
+            self._entries[game.id] = entry
+            self._entries.move_to_end(game.id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, game_id: int):
+        with self._lock:
+            if self._entries.pop(game_id, None) is not None:
+                self.invalidations += 1
+
+    def _on_game_changed(self, game: Game):
+        if game.id is not None:
+            self.invalidate(game.id)
+
+    def _on_player_changed(self, player: Player):
+        if player is not None:
+            self._invalidate_players({player.id})
+
+    def _on_players_upserted(self, rows: list[dict]):
+        self._invalidate_players({row["id"] for row in rows if row.get("id") is not None})
+
+    def _invalidate_players(self, player_ids: set[int]):
+        """Drop the games of these players"""
+        if not player_ids:
+            return
+        with self._lock:
+            stale = [
+                game_id for game_id, entry in self._entries.items()
+                if entry.player_one["id"] in player_ids or entry.player_two["id"] in player_ids
+            ]
+            for game_id in stale:
+                del self._entries[game_id]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else None,
+            }
+
+
+# One cache per process
+game_cache = GameCache()
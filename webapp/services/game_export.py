@@ -0,0 +1,160 @@
+"""
+Streaming export of games, with their moves, as NDJSON or CSV.
+
+Games are read in batches of EXPORT_BATCH_SIZE (by id, so each batch is a
+short query rather than one long-running cursor), and each batch is written
+out before the next is read; memory use doesn't grow with the number of games.
+A game's moves come from its packed move log, so usually no further query is
+needed. Games that predate the log have their moves read in one query per batch.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple
+
+from webapp.models.base import read_session
+from webapp.models.game import Game
+from webapp.models.game_move import GameMove
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS = [
+    "id", "player_one_id", "player_two_id", "status", "board_rows", "board_cols", "win_length",
+    "board_state", "winning_player_id", "winning_player_number", "finished_at", "moves",
+]
+
+
+def _naive_utc(moment: datetime) -> datetime:
+    """A timestamp as naive UTC, as Game.finished_at is stored"""
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+class ExportFilter(NamedTuple):
+    """Which games to export (all games, by default)"""
+    finished_after: datetime | None = None
+    min_id: int | None = None
+    max_id: int | None = None
+
+    @classmethod
+    def from_params(cls, params) -> "ExportFilter":
+        """
+        Parse filter parameters (e.g. a request's query string).
+
+        Args:
+            params: Mapping with (optional) finished_after (ISO 8601; UTC unless it has an offset),
+                min_id and max_id
+        """
+        finished_after = params.get("finished_after")
+        min_id = params.get("min_id")
+        max_id = params.get("max_id")
+        try:
+            return cls(
+                _naive_utc(datetime.fromisoformat(finished_after)) if finished_after else None,
+                int(min_id) if min_id not in (None, "") else None,
+                int(max_id) if max_id not in (None, "") else None,
+            )
+        except ValueError:
+            raise ValueError("Invalid filter; expected finished_after as an ISO 8601 timestamp, "
+                             "and min_id/max_id as integers")
+
+
+def iter_games(export_filter: ExportFilter = ExportFilter(), batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[dict]:
+    """
+    Every game matching the filter, in id order, with its moves (as a list of cell numbers).
+
+    Args:
+        export_filter: Which games to export
+        batch_size: Games read per query
+    """
+    finished_after, min_id, max_id = export_filter
+    columns = [
+        Game.id, Game.player_one_id, Game.player_two_id, Game.status, Game.board_rows, Game.board_cols,
+        Game.win_length, Game.board_state, Game.winning_player_id, Game.winning_player_number,
+        Game.finished_at, Game.move_log,
+    ]
+    last_id = min_id - 1 if min_id is not None else None
+
+    with read_session() as session:
+        while True:
+            query = session.query(*columns)
+            if last_id is not None:
+                query = query.filter(Game.id > last_id)
+            if max_id is not None:
+                query = query.filter(Game.id <= max_id)
+            if finished_after is not None:
+                query = query.filter(Game.finished_at > finished_after)
+            rows = query.order_by(Game.id).limit(batch_size).all()
+            if not rows:
+                return
+
+            # Games without a move log: their moves in one query, for the whole batch
+            logged_moves = {}
+            unlogged_ids = [row.id for row in rows if row.move_log is None]
+            if unlogged_ids:
+                for game_id, position in session.query(GameMove.game_id, GameMove.position).filter(
+                        GameMove.game_id.in_(unlogged_ids)
+                ).order_by(GameMove.game_id, GameMove.move_sequence):
+                    logged_moves.setdefault(game_id, []).append(position)
+
+            for row in rows:
+                yield {
+                    "id": row.id,
+                    "player_one_id": row.player_one_id,
+                    "player_two_id": row.player_two_id,
+                    "status": row.status.name,
+                    "board_rows": row.board_rows,
+                    "board_cols": row.board_cols,
+                    "win_length": row.win_length,
+                    "board_state": row.board_state,
+                    "winning_player_id": row.winning_player_id,
+                    "winning_player_number": row.winning_player_number.name if row.winning_player_number else None,
+                    "finished_at": row.finished_at.isoformat() if row.finished_at else None,
+                    "moves": list(row.move_log) if row.move_log is not None else logged_moves.get(row.id, []),
+                }
+
+            last_id = rows[-1].id
+            if len(rows) < batch_size:
+                return
+
+
+def to_ndjson(games: Iterator[dict]) -> Iterator[str]:
+    """One JSON document per game, per line"""
+    for game in games:
+        yield json.dumps(game, separators=(",", ":")) + "\n"
+
+
+def to_csv(games: Iterator[dict]) -> Iterator[str]:
+    """A header, then one row per game (moves as space-separated cell numbers)"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for game in games:
+        writer.writerow({**game, "moves": " ".join(map(str, game["moves"]))})
+        # Hand over what has been written so far, in chunks of a reasonable size
+        if buffer.tell() >= 64 * 1024:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_games(export_format: str, export_filter: ExportFilter = ExportFilter()) -> Iterator[str]:
+    """
+    Stream the matching games in the given format.
+
+    Args:
+        export_format: "ndjson" or "csv"
+        export_filter: Which games to export
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid format; expected one of {', '.join(EXPORT_FORMATS)}")
+    games = iter_games(export_filter)
+    return to_ndjson(games) if export_format == "ndjson" else to_csv(games)
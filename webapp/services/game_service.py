@@ -1,9 +1,22 @@
+from contextlib import contextmanager
+
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+
+from webapp import board
 from webapp.helpers import GamePosition, GameStatus
 from webapp.models.player import Player
-from webapp.models.game import Game
+from webapp.models.player_stat import PlayerStat
+from webapp.models.game import Game, GAMES_MAX_BULK_CREATE
 from webapp.models.game_move import GameMove
-from webapp.models.base import db
-from webapp.bots import get_bot_strategy
+from webapp.models.base import db, commit_keeping
+from webapp.services.bot_executor import bot_executor
+from webapp.services.game_cache import game_cache, UNKNOWN
+
+
+class MoveConflictError(ValueError):
+    """The game was advanced by another request, since it was read"""
 
 
 class GameService:
@@ -12,8 +25,15 @@ class GameService:
     player_one: Player
     player_two: Player
     game: Game
+    bot_move_pending: bool
 
-    def __init__(self, player_one_id: int = None, player_two_id: int = None, game_id: int = None):
+    def __init__(
+            self,
+            player_one_id: int = None,
+            player_two_id: int = None,
+            game_id: int = None,
+            defer_bot_moves: bool = None
+    ):
         """
         Initialize the game service with players and/or existing game.
         
@@ -21,15 +41,30 @@ class GameService:
             player_one_id: Optional ID of player one
             player_two_id: Optional ID of player two
             game_id: Optional ID of existing game to load
+            defer_bot_moves: Hand bot turns to the bot executor, rather than playing them
+                in this request (defaults to the BOT_MOVES_ASYNC setting)
         """
         self.player_one = None
         self.player_two = None
         self.game = None
+        self.bot_move_pending = False
+        self._last_move_position = UNKNOWN
+        self._from_cache = False
+        if defer_bot_moves is None:
+            defer_bot_moves = current_app.config.get("BOT_MOVES_ASYNC", False)
+        self.defer_bot_moves = defer_bot_moves
+        self.record_move_rows = current_app.config.get("GAME_MOVE_ROWS", True)
 
         if game_id:
-            self.game = Game.get_game_by_id(int(game_id))
-            if not self.game:
-                raise ValueError("Invalid Game ID")
+            cached = game_cache.load(int(game_id))
+            if cached:
+                self.game, self.player_one, self.player_two, self._last_move_position = cached
+                self._from_cache = True
+            else:
+                # Game and both players in one query (rather than any copies left in the session)
+                self.game = Game.get_game_by_id(int(game_id), load_players=True, refresh=True)
+                if not self.game:
+                    raise ValueError("Invalid Game ID")
 
         if player_one_id:
             self.player_one = Player.get_player_by_id(int(player_one_id))
@@ -40,41 +75,94 @@ class GameService:
                     raise ValueError(
                         f"Unexpected ID for Player 1. Expected {self.game.player_one_id}, got {self.player_one.id}")
         elif self.game:
-            self.player_one = Player.get_player_by_id(int(self.game.player_one_id))
+            self.player_one = self.game.player_one
 
         if player_two_id:
             self.player_two = Player.get_player_by_id(int(player_two_id))
             if not self.player_two:
                 raise ValueError("Invalid ID for Player 2")
             if self.game:
-                if self.game.player_one_id != self.player_one.id:
+                if self.game.player_two_id != self.player_two.id:
                     raise ValueError(
                         f"Unexpected ID for Player 2. Expected {self.game.player_two_id}, got {self.player_two.id}")
         elif self.game:
-            self.player_two = Player.get_player_by_id(int(self.game.player_two_id))
+            self.player_two = self.game.player_two
 
-    def create_game(self) -> Game:
+    def create_game(self, board_spec: board.BoardSpec = board.STANDARD_BOARD) -> Game:
         """
         Create a new game and perform any necessary automated moves.
-        
+
+        Args:
+            board_spec: Optional board dimensions and win rule (defaults to 3x3, 3 in a row)
+
         Returns:
             Game: The newly created game
         """
         if not all([self.player_one, self.player_two]):
             raise ValueError(f"Cannot create game without first specifying player IDs.")
 
-        self.game = Game(self.player_one.id, self.player_two.id)
+        self.game = Game(self.player_one.id, self.player_two.id, board_spec)
 
         # Append to database:
         db.session.add(self.game)
-        db.session.commit()  # Need to commit, prior to automated moves. This ensures that we have a GameId.
+        db.session.flush()  # Need to flush, prior to automated moves. This ensures that we have a GameId.
 
-        # Determine if any automated moves to be executed
-        self._perform_automated_moves()
+        # Determine if any automated moves to be executed, and commit the game
+        # along with them (unless the game was committed when bot turns were deferred):
+        if not self._perform_automated_moves():
+            self._commit()
 
         return self.game
 
-    def append_game_move(self, move_sequence: int, player_id: int, position: GamePosition) -> Game:
+    @classmethod
+    def create_games(cls, player_pairs, board_spec: board.BoardSpec = board.STANDARD_BOARD) -> list[Game]:
+        """
+        Create many games at once, committed together.
+
+        The players are checked with one query and the games inserted in bulk. Bot
+        openings are then played for every game, and their moves inserted together
+        (always within this request, whatever the BOT_MOVES_ASYNC setting).
+
+        Args:
+            player_pairs: (player one ID, player two ID) for each game
+            board_spec: Optional board dimensions and win rule, for every game
+
+        Returns:
+            list[Game]: The new games, in the order given
+        """
+        try:
+            pairs = [(int(player_one_id), int(player_two_id)) for player_one_id, player_two_id in player_pairs]
+        except (TypeError, ValueError):
+            raise ValueError("Each game needs a player one ID and a player two ID")
+        if not pairs:
+            raise ValueError("No games specified")
+        if len(pairs) > GAMES_MAX_BULK_CREATE:
+            raise ValueError(f"Too many games; at most {GAMES_MAX_BULK_CREATE} may be created at once")
+
+        players = Player.get_players_by_ids(player_id for pair in pairs for player_id in pair)
+        unknown_ids = sorted({player_id for pair in pairs for player_id in pair} - players.keys())
+        if unknown_ids:
+            raise ValueError(f"Invalid Player IDs: {', '.join(map(str, unknown_ids))}")
+
+        games = [Game(player_one_id, player_two_id, board_spec) for player_one_id, player_two_id in pairs]
+        Game.bulk_add(games)
+
+        game_service = cls(defer_bot_moves=False)
+        moves = []
+        # Games the bots finish are counted in the players' stats together
+        with PlayerStat.batched():
+            for game in games:
+                game_service.game = game
+                game_service.player_one = players[game.player_one_id]
+                game_service.player_two = players[game.player_two_id]
+                moves.extend(game_service._play_bot_moves())
+        if game_service.record_move_rows:
+            GameMove.bulk_add(moves)
+
+        commit_keeping(*games, *players.values())
+        return games
+
+    def append_game_move(self, move_sequence: int, player_id: int, position: int) -> Game:
         """
         Add a move to the game and update game state.
         
@@ -91,30 +179,109 @@ class GameService:
         sanitised_player_id = int(player_id)
         sanitised_position = self._sanitise_position(position)
 
-        # Validate inputs
-        self._validate_move(sanitised_move_sequence, sanitised_player_id, sanitised_position)
+        # Validate inputs (if the cached copy of the game rejects the move, check again
+        # against the database; another process may have moved since it was cached)
+        try:
+            self._validate_move(sanitised_move_sequence, sanitised_player_id, sanitised_position)
+        except ValueError:
+            if not self._from_cache:
+                raise
+            self._reload()
+            self._validate_move(sanitised_move_sequence, sanitised_player_id, sanitised_position)
 
-        move = GameMove(
-            game_id=self.game.id,
-            move_sequence=sanitised_move_sequence,
-            player_number=self.game.next_move_player_number,
-            player_id=sanitised_player_id,
-            position=sanitised_position,
-        )
-        # Append the update to our set of DB transactions:
-        db.session.add(move)
+        with self._conflicts_as_errors(sanitised_move_sequence):
+            player_number = self.game.next_move_player_number
+            if self.record_move_rows:
+                move = GameMove(
+                    game_id=self.game.id,
+                    move_sequence=sanitised_move_sequence,
+                    player_number=player_number,
+                    player_id=sanitised_player_id,
+                    position=sanitised_position,
+                )
+                # Append the update to our set of DB transactions:
+                db.session.add(move)
+            self._last_move_position = int(sanitised_position)
 
-        # An update is required for Game model also:
-        newly_updated_game = self.game.append_move(move.player_number, move.position)
-        db.session.add(newly_updated_game)
+            # The Game is updated too, including its move log
+            # (only applied if the game is still at this move sequence):
+            newly_updated_game = self.game.append_move(player_number, sanitised_position)
+            db.session.add(newly_updated_game)
 
-        self._perform_automated_moves()
-
-        # Commit all updates to the database:
-        db.session.commit()
+            # Commit all updates to the database (unless already committed, to defer bot turns):
+            if not self._perform_automated_moves():
+                self._commit()
 
         return self.game
     
+    def append_game_moves(self, move_sequence: int, moves: list) -> Game:
+        """
+        Add an ordered list of moves to the game, committed together.
+
+        Every move is validated against the board as the moves before it leave it; if
+        any is invalid, none are saved. Bot turns after the last move are played as usual.
+
+        Args:
+            move_sequence: The sequence number of the first move
+            moves: Each move, as a position, or a dict with a position and (optionally)
+                player_id; where player_id is omitted, it's whoever's turn it is
+
+        Returns:
+            Game: The updated game
+        """
+        sanitised_move_sequence = int(move_sequence)
+        if not self.game:
+            raise ValueError("Invalid Game ID")
+        parsed_moves = self._parse_moves(sanitised_move_sequence, moves)
+
+        with self._conflicts_as_errors(sanitised_move_sequence):
+            try:
+                rows = self._apply_moves(sanitised_move_sequence, parsed_moves)
+            except ValueError:
+                if not self._from_cache:
+                    raise
+                self._reload()
+                rows = self._apply_moves(sanitised_move_sequence, parsed_moves)
+            if self.record_move_rows:
+                GameMove.bulk_add(rows)
+
+            if not self._perform_automated_moves():
+                self._commit()
+
+        return self.game
+
+    def import_game(self, moves: list, board_spec: board.BoardSpec = board.STANDARD_BOARD) -> Game:
+        """
+        Create a game from a recorded list of moves (e.g. from another system), in one transaction.
+
+        Bot players don't move until the recorded moves have all been replayed. As each
+        game is its own transaction, a finished game's stats are upserted with it (one
+        statement per finished game, rather than one per batch as for create_games()).
+
+        Args:
+            moves: Each move, as for append_game_moves()
+            board_spec: Optional board dimensions and win rule (defaults to 3x3, 3 in a row)
+
+        Returns:
+            Game: The new game
+        """
+        if not all([self.player_one, self.player_two]):
+            raise ValueError(f"Cannot create game without first specifying player IDs.")
+        parsed_moves = self._parse_moves(1, moves)
+
+        self.game = Game(self.player_one.id, self.player_two.id, board_spec)
+        db.session.add(self.game)
+        db.session.flush()  # For the game ID
+
+        rows = self._apply_moves(1, parsed_moves)
+        if self.record_move_rows:
+            GameMove.bulk_add(rows)
+
+        if not self._perform_automated_moves():
+            self._commit()
+
+        return self.game
+
     def get_next_turn_player(self) -> Player:
         """
         Get the player whose turn it is next.
@@ -138,23 +305,60 @@ class GameService:
         Returns:
             int: The position value of the last move, or None if no moves yet
         """
-        last_move = self.game.moves.order_by(GameMove.move_sequence.desc()).first()
-        if not last_move:
-            return None
-        return last_move.position.value
+        if self._last_move_position is UNKNOWN:
+            self._last_move_position = self.game.last_move_position
+            self._store_in_cache()
+        return self._last_move_position
 
-    def _sanitise_position(self, position) -> GamePosition:
-        """Sanitise position input to GamePosition enum"""
-        if type(position) == str:
-            return GamePosition(int(position))
-        elif type(position) == int:
-            return GamePosition(position)
-        elif type(position) == GamePosition:
-            return position
+    @contextmanager
+    def _conflicts_as_errors(self, move_sequence: int):
+        """Report a concurrent update of the game (stale version, or duplicate move) as MoveConflictError"""
+        game_id = self.game.id
+        try:
+            yield
+        except (StaleDataError, IntegrityError) as err:
+            db.session.rollback()
+            game_cache.invalidate(game_id)
+            raise MoveConflictError(
+                f"Game {game_id} was updated by another request; move {move_sequence} has already been played."
+            ) from err
+
+    def _commit(self):
+        """Commit, and write the game's new state through to the game cache"""
+        commit_keeping(self.game, self.player_one, self.player_two)
+        self._store_in_cache()
+
+    def _reload(self):
+        """Replace a cached copy of the game (which may be stale) with its state in the database"""
+        game_id = self.game.id
+        game_cache.invalidate(game_id)
+        self.game = Game.get_game_by_id(game_id, load_players=True, refresh=True)
+        if not self.game:
+            raise ValueError("Invalid Game ID")
+        self.player_one, self.player_two = self.game.player_one, self.game.player_two
+        self._last_move_position = UNKNOWN
+        self._from_cache = False
+
+    def _store_in_cache(self):
+        if self.game and self.player_one and self.player_two:
+            game_cache.store(self.game, self.player_one, self.player_two, self._last_move_position)
+
+    def _sanitise_position(self, position) -> int:
+        """Sanitise position input to a (1-based) cell number, on this game's board"""
+        if isinstance(position, (str, int)):
+            position = int(position)
         else:
             raise ValueError("Unexpected GamePosition type")
 
-    def _validate_move(self, move_sequence: int, player_id: int, position: GamePosition):
+        spec = self.game.board_spec if self.game else board.STANDARD_BOARD
+        if not 1 <= position <= spec.cell_count:
+            raise ValueError(f"Invalid position specified; expected 1 to {spec.cell_count}, got {position}")
+
+        if spec.is_standard:
+            return GamePosition(position)
+        return position
+
+    def _validate_move(self, move_sequence: int, player_id: int, position: int):
         """Validate that a move is legal"""
         if not self.game:
             raise ValueError("Invalid Game ID")
@@ -187,28 +391,148 @@ class GameService:
                             player_id
                         ))
 
-        if position not in self.game.get_valid_next_positions():
+        spec = self.game.board_spec
+        p1, p2 = board.from_board_state(self.game.board_state)
+        if not board.empty_cells(p1, p2, spec) & spec.cell_bits[position - 1]:
             raise ValueError(
-                f"Invalid position specified; {position.name} is already occupied."
+                f"Invalid position specified; {getattr(position, 'name', position)} is already occupied."
             )
 
-    def _perform_automated_moves(self):
-        """Execute moves for bot players until a human player's turn or game ends"""
+    @staticmethod
+    def _parse_moves(move_sequence: int, moves) -> list[tuple]:
+        """
+        Check the shape of a submitted list of moves (before anything is applied).
+
+        Args:
+            move_sequence: The sequence number of the first move (for error messages)
+            moves: Each move, as a position, or a dict with a position and (optionally) player_id
+
+        Returns:
+            (player_id or None, position) of each move
+        """
+        if not isinstance(moves, list):
+            raise ValueError("Expected moves to be a list of positions, or of {player_id, position} objects")
+        if not moves:
+            raise ValueError("No moves specified")
+
+        def is_int(value) -> bool:
+            return isinstance(value, int) and not isinstance(value, bool)
+
+        parsed = []
+        for index, move in enumerate(moves):
+            if isinstance(move, dict):
+                player_id, position = move.get('player_id'), move.get('position')
+            else:
+                player_id, position = None, move
+            if not is_int(position) or not (player_id is None or is_int(player_id)):
+                raise ValueError(
+                    f"Move {move_sequence + index}: expected a position (an integer), "
+                    f"or an object with an integer position and (optionally) an integer player_id"
+                )
+            parsed.append((player_id, position))
+        return parsed
+
+    def _apply_moves(self, move_sequence: int, moves: list[tuple]) -> list[dict]:
+        """
+        Validate and apply moves to the game, in memory (the session is rolled back if any is invalid).
+
+        Args:
+            move_sequence: The sequence number of the first move
+            moves: (player_id or None, position) of each move, from _parse_moves()
+
+        Returns:
+            Column values of each move, for GameMove.bulk_add()
+        """
+        rows = []
+        try:
+            for player_id, position in moves:
+                if player_id is None:
+                    next_player = self.get_next_turn_player()
+                    player_id = next_player.id if next_player else None
+
+                sanitised_position = self._sanitise_position(position)
+                self._validate_move(move_sequence + len(rows), player_id, sanitised_position)
+                rows.append({
+                    "game_id": self.game.id,
+                    "move_sequence": self.game.next_move_sequence,
+                    "player_number": self.game.next_move_player_number,
+                    "player_id": player_id,
+                    "position": int(sanitised_position),
+                })
+                self.game.append_move(self.game.next_move_player_number, sanitised_position)
+        except (ValueError, TypeError) as err:
+            # Discard the moves applied so far
+            game_id = self.game.id
+            db.session.rollback()
+            game_cache.invalidate(game_id)
+            raise ValueError(f"Move {move_sequence + len(rows)}: {err.args[0]}") from err
+
+        self._last_move_position = rows[-1]["position"]
+        return rows
+
+    def _perform_automated_moves(self) -> bool:
+        """
+        Execute moves for bot players until a human player's turn or game ends.
+
+        Returns:
+            True if the bot turns were handed to the bot executor; the game has then
+            been committed, and the caller must not commit (or cache) it again, as the
+            worker may already have moved. Otherwise, the caller commits the moves.
+        """
         if all([self.player_one, self.player_two, self.game]):
 
-            while True:
-                if self.game.status != GameStatus.IN_PROGRESS:
-                    break
+            next_player = self.get_next_turn_player()
+            if self.defer_bot_moves and next_player and next_player.player_type == "computer":
+                # The worker loads the game afresh, so commit what we have first
+                self._commit()
+                self.bot_move_pending = bot_executor.submit(self.game.id, _play_bot_turns)
+                if self.bot_move_pending:
+                    return True
+                # Queue is full; play the bot turns in this request instead
+                self.defer_bot_moves = False
+
+            # Every consecutive bot move is worked out in memory, then the moves are
+            # inserted together; the caller commits them along with the game.
+            moves = self._play_bot_moves()
+            if self.record_move_rows:
+                GameMove.bulk_add(moves)
+        return False
+
+    def _play_bot_moves(self) -> list[dict]:
+        """
+        Apply bot moves to the game (in memory) until a human player's turn or the game ends.
+
+        Returns:
+            Column values of each move played, for GameMove.bulk_add()
+        """
+        moves = []
+        while self.game.status == GameStatus.IN_PROGRESS:
+            next_player = self.get_next_turn_player()
+            if next_player.player_type != "computer":
+                break
+
+            # Get bot strategy and calculate move
+            selected_position = self._sanitise_position(
+                bot_executor.calculate_move(next_player.bot_difficulty, self.game)
+            )
+            self._validate_move(self.game.next_move_sequence, next_player.id, selected_position)
+            moves.append({
+                "game_id": self.game.id,
+                "move_sequence": self.game.next_move_sequence,
+                "player_number": self.game.next_move_player_number,
+                "player_id": next_player.id,
+                "position": int(selected_position),
+            })
+            self.game.append_move(self.game.next_move_player_number, selected_position)
 
-                next_player = self.get_next_turn_player()
+        if moves:
+            self._last_move_position = moves[-1]["position"]
+        return moves
 
-                if next_player.player_type == "human":
-                    break
 
-                if next_player.player_type == "computer":
-                    # Get bot strategy and calculate move
-                    bot_strategy = get_bot_strategy(next_player.bot_difficulty)
-                    selected_position = bot_strategy.calculate_next_move(self.game)
-                    self.append_game_move(move_sequence=self.game.next_move_sequence,
-                                        player_id=next_player.id,
-                                        position=selected_position)
\ No newline at end of file
+def _play_bot_turns(game_id: int):
+    """Play a game's bot turns (on a bot executor worker)"""
+    game_service = GameService(game_id=game_id, defer_bot_moves=False)
+    with game_service._conflicts_as_errors(game_service.game.next_move_sequence):
+        if not game_service._perform_automated_moves():
+            game_service._commit()
@@ -0,0 +1,50 @@
+"""
+In-memory stand-in for Game, for playing bot moves without the database.
+
+Used by headless self-play (webapp.simulation) and to hand a game's position
+to a bot in another process (webapp.services.bot_executor).
+"""
+
+from webapp import board
+
+
+class SimulatedGame:
+    """
+    In-memory stand-in for Game, with just what bot strategies read.
+
+    Simulated games get negative ids, so they never share cached state (e.g.
+    stored search trees) with real games.
+    """
+
+    __slots__ = ("id", "board_spec", "masks", "next_move_sequence", "next_move_player_number")
+
+    def __init__(self, game_id: int, spec: board.BoardSpec = board.STANDARD_BOARD):
+        self.id = game_id
+        self.board_spec = spec
+        self.masks = [0, 0, 0]
+        self.next_move_sequence = 1
+        self.next_move_player_number = 1
+
+    @property
+    def board_state(self) -> str:
+        return board.to_board_state(self.masks[1], self.masks[2], self.board_spec)
+
+    def get_bitboard(self) -> board.Bitboard:
+        return board.Bitboard(self.masks[1], self.masks[2], self.next_move_player_number, self.board_spec)
+
+    def append_move(self, position: int) -> int | None:
+        """
+        Play a move for the player whose turn it is.
+
+        Returns:
+            PLAYER_ONE_WINS, PLAYER_TWO_WINS, TIE, or None if the game continues
+        """
+        spec = self.board_spec
+        bit = spec.cell_bits[int(position) - 1]
+        if (self.masks[1] | self.masks[2]) & bit:
+            raise ValueError(f"Position {int(position)} is already occupied.")
+
+        self.masks[self.next_move_player_number] |= bit
+        self.next_move_player_number = 3 - self.next_move_player_number
+        self.next_move_sequence += 1
+        return board.winner_after_move(self.masks[1], self.masks[2], bit, spec)
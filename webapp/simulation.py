@@ -0,0 +1,244 @@
+"""
+Headless self-play: bot-vs-bot games played entirely in memory.
+
+Games are played on a lightweight stand-in for Game (no database rows, no
+session), and fanned out over a process pool in chunks. Each chunk seeds the
+random module from the run's seed and its chunk number, so a run is
+repeatable for a given seed, however the chunks are spread over workers.
+
+Used to calibrate difficulties and to regression-test bot speed:
+
+    python -m webapp.simulation hard expert --games 100000
+"""
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterator, List, Tuple
+
+from webapp import board
+from webapp.bots import get_bot_strategy
+from webapp.bots.strategy import BotStrategy
+from webapp.simulated_game import SimulatedGame
+
+# Games per task sent to a worker process
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class LatencyStats:
+    """Time taken by one bot to choose its moves"""
+    moves: int = 0
+    total_ns: int = 0
+    max_ns: int = 0
+
+    def add(self, elapsed_ns: int):
+        self.moves += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+    def merge(self, other: "LatencyStats"):
+        self.moves += other.moves
+        self.total_ns += other.total_ns
+        self.max_ns = max(self.max_ns, other.max_ns)
+
+    @property
+    def mean_ms(self) -> float | None:
+        return self.total_ns / self.moves / 1e6 if self.moves else None
+
+    def to_dict(self) -> dict:
+        return {
+            "moves": self.moves,
+            "mean_ms": self.mean_ms,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+@dataclass
+class SimulationResult:
+    """Aggregated results; wins and losses are from player one's point of view"""
+    difficulty_one: str
+    difficulty_two: str
+    games: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    elapsed: float = 0.0
+    latency_one: LatencyStats = field(default_factory=LatencyStats)
+    latency_two: LatencyStats = field(default_factory=LatencyStats)
+
+    def add_game(self, result: int):
+        self.games += 1
+        if result == board.PLAYER_ONE_WINS:
+            self.wins += 1
+        elif result == board.PLAYER_TWO_WINS:
+            self.losses += 1
+        else:
+            self.draws += 1
+
+    def merge(self, other: "SimulationResult"):
+        self.games += other.games
+        self.wins += other.wins
+        self.draws += other.draws
+        self.losses += other.losses
+        self.latency_one.merge(other.latency_one)
+        self.latency_two.merge(other.latency_two)
+
+    def to_dict(self) -> dict:
+        return {
+            "player_one": self.difficulty_one,
+            "player_two": self.difficulty_two,
+            "games": self.games,
+            "wins": self.wins,
+            "draws": self.draws,
+            "losses": self.losses,
+            "elapsed": self.elapsed,
+            "games_per_second": self.games / self.elapsed if self.elapsed else None,
+            "latency_one": self.latency_one.to_dict(),
+            "latency_two": self.latency_two.to_dict(),
+        }
+
+
+def play_game(
+        bot_one: BotStrategy,
+        bot_two: BotStrategy,
+        game: SimulatedGame,
+        latencies: Tuple[LatencyStats, LatencyStats] | None = None
+) -> int:
+    """
+    Play a game to completion.
+
+    Args:
+        bot_one: Strategy for player one
+        bot_two: Strategy for player two
+        game: A new SimulatedGame
+        latencies: Optional (player one, player two) stats to record move times in
+
+    Returns:
+        PLAYER_ONE_WINS, PLAYER_TWO_WINS or TIE
+    """
+    bots = (None, bot_one, bot_two)
+    while True:
+        player_number = game.next_move_player_number
+        started = time.perf_counter_ns()
+        position = bots[player_number].calculate_next_move(game)
+        if latencies:
+            latencies[player_number - 1].add(time.perf_counter_ns() - started)
+        result = game.append_move(position)
+        if result:
+            return result
+
+
+def _run_chunk(
+        difficulty_one: str,
+        difficulty_two: str,
+        dimensions: Tuple[int, int, int],
+        first_game: int,
+        games: int,
+        seed: int | None
+) -> SimulationResult:
+    """Play one chunk of games (in a worker process)"""
+    if seed is not None:
+        random.seed(seed * 1_000_003 + first_game)
+
+    spec = board.get_spec(*dimensions)
+    bot_one = get_bot_strategy(difficulty_one)
+    bot_two = get_bot_strategy(difficulty_two)
+    result = SimulationResult(difficulty_one, difficulty_two)
+    latencies = (result.latency_one, result.latency_two)
+    for game_number in range(first_game, first_game + games):
+        game = SimulatedGame(-(game_number + 1), spec)
+        result.add_game(play_game(bot_one, bot_two, game, latencies))
+    return result
+
+
+def _chunks(games: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for first_game in range(0, games, chunk_size):
+        yield first_game, min(chunk_size, games - first_game)
+
+
+def simulate(
+        difficulty_one: str,
+        difficulty_two: str,
+        games: int,
+        spec: board.BoardSpec = board.STANDARD_BOARD,
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        seed: int | None = None
+) -> SimulationResult:
+    """
+    Play a number of bot-vs-bot games in memory.
+
+    Args:
+        difficulty_one: Difficulty of player one (as for get_bot_strategy)
+        difficulty_two: Difficulty of player two
+        games: Number of games to play
+        spec: The board's dimensions and win rule
+        workers: Number of worker processes (default: one per CPU); 1 plays in this process
+        chunk_size: Games per task sent to a worker
+        seed: Makes the run repeatable
+
+    Returns:
+        SimulationResult
+    """
+    if games < 0 or chunk_size < 1:
+        raise ValueError("Games must not be negative, and chunk size must be positive")
+
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    total = SimulationResult(difficulty_one, difficulty_two)
+    chunks: List[Tuple[int, int]] = list(_chunks(games, chunk_size))
+
+    if workers == 1 or len(chunks) <= 1:
+        for first_game, count in chunks:
+            total.merge(_run_chunk(difficulty_one, difficulty_two, spec.dimensions, first_game, count, seed))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            futures = [
+                executor.submit(_run_chunk, difficulty_one, difficulty_two, spec.dimensions, first_game, count, seed)
+                for first_game, count in chunks
+            ]
+            for future in futures:
+                total.merge(future.result())
+
+    total.elapsed = time.perf_counter() - started
+    return total
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description="Play bot-vs-bot games in memory, and report the results.")
+    parser.add_argument("difficulty_one", help="Difficulty of player one")
+    parser.add_argument("difficulty_two", help="Difficulty of player two")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--rows", type=int, default=3)
+    parser.add_argument("--cols", type=int, default=3)
+    parser.add_argument("--win-length", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=None)
+    options = parser.parse_args(args)
+
+    result = simulate(
+        options.difficulty_one,
+        options.difficulty_two,
+        options.games,
+        board.get_spec(options.rows, options.cols, options.win_length),
+        options.workers,
+        options.chunk_size,
+        options.seed
+    )
+    summary = result.to_dict()
+    print("{player_one} vs {player_two}: {games} games in {elapsed:.2f}s".format(**summary))
+    print("  player one: {wins} won, {draws} drawn, {losses} lost".format(**summary))
+    for label, latency in (("player one", result.latency_one), ("player two", result.latency_two)):
+        if latency.moves:
+            print("  {}: {} moves, {:.3f}ms mean, {:.3f}ms max".format(
+                label, latency.moves, latency.mean_ms, latency.max_ns / 1e6))
+
+
+if __name__ == "__main__":
+    main()
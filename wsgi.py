@@ -8,8 +8,8 @@ if project_home not in sys.path:
 
 # Import from the project directory
 from webapp import create_app
-from config import DevConfig
-config = DevConfig()
+from config import ProdConfig
+config = ProdConfig()
 
 # Create flask app, but need to call it "application" for WSGI to work
 application = create_app(config)
\ No newline at end of file